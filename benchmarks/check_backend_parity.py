@@ -0,0 +1,70 @@
+"""
+Parity check of the table-building backends, with their build times.
+
+Builds every dimension and fact table from the same source with each backend and
+reports any table that differs from the pandas backend's, row by row and value by
+value. The source is split into chunks built one after another with a shared key
+registry per backend, so keys reused across chunks are checked too. Exits with
+status 1 if any table differs.
+
+Usage:
+    python -m benchmarks.check_backend_parity --rows 200000
+    python -m benchmarks.check_backend_parity --csv raw_data.csv --chunks 3
+"""
+import argparse
+import sys
+import tempfile
+import time
+from os.path import join
+import numpy as np
+from benchmarks.generate_shipments import write_shipments_csv
+from database.populate_db_table import build_tables
+from dataload.key_registry import KeyRegistry
+from dataload.read_source import read_source
+from dataload.transform_backend import BACKENDS, compare_tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv", default=None, help="Source CSV; a synthetic one is generated when omitted.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows of the synthetic CSV.")
+    parser.add_argument("--chunks", type=int, default=2, help="Number of chunks the source is built in.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="Backends to compare; the first is the reference.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = join(tmp_dir, "shipments.csv")
+            write_shipments_csv(csv_path, args.rows)
+        data_df = read_source(csv_path)
+
+    chunks = [data_df.iloc[rows] for rows in np.array_split(np.arange(len(data_df)), args.chunks)]
+    reference, *others = args.backends
+    registries = {backend: KeyRegistry() for backend in args.backends}
+    seconds = dict.fromkeys(args.backends, 0.0)
+    failed = False
+
+    sales_id_start = 102
+    for chunk_number, chunk_df in enumerate(chunks, start=1):
+        tables = {}
+        for backend in args.backends:
+            started = time.perf_counter()
+            tables[backend] = build_tables(chunk_df, registries[backend], sales_id_start, backend=backend)
+            seconds[backend] += time.perf_counter() - started
+
+        for backend in others:
+            for table_name, difference in compare_tables(tables[reference], tables[backend]).items():
+                failed = True
+                print(f"chunk {chunk_number}: {table_name} differs between {reference} and {backend}:\n{difference}")
+        sales_id_start += len(chunk_df)
+
+    for backend in args.backends:
+        print(f"{backend:>8}: {seconds[backend]:.3f}s for {len(data_df)} rows")
+    print("Backends differ" if failed else f"All tables identical across {', '.join(args.backends)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
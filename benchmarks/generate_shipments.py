@@ -0,0 +1,213 @@
+"""
+Generator of synthetic courier shipment data in the layout of `raw_data.csv`.
+
+Every dimension member (carrier, customer, product, city) has fixed attributes, so
+the generated rows satisfy the same dependencies as real data (a customer always has
+the same segment and city, a carrier the same rating and route). Members are drawn
+with a Zipf-like skew, so a few customers and products account for most shipments.
+
+Large files are written in chunks, so the memory used does not grow with `--rows`.
+
+Usage:
+    python -m benchmarks.generate_shipments shipments.csv --rows 1000000
+    python -m benchmarks.generate_shipments shipments.csv --rows 100000000 --customers 1000000 --days 1095
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+COUNTRIES = np.array(["UK", "US", "NG", "DE", "FR", "GH", "CA", "IN"], dtype=object)
+SEGMENTS = np.array(["Retail", "Corporate", "SME"], dtype=object)
+PAYMENT_METHODS = np.array(["Card", "Cash", "Transfer", "Wallet"], dtype=object)
+TRANSPORT_MODES = np.array(["Air", "Road", "Sea", "Rail"], dtype=object)
+PRIORITIES = np.array(["High", "Medium", "Low"], dtype=object)
+
+
+def _names(prefix: str, count: int) -> np.ndarray:
+    return np.array([f"{prefix}{i}" for i in range(count)], dtype=object)
+
+
+def _weights(count: int, skew: float) -> np.ndarray:
+    """Zipf-like popularity of `count` members; uniform when `skew` is 0."""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def shipment_members(carriers: int = 20, customers: int = 5000, products: int = 200, cities: int = 50,
+                     categories: int = 10, seed: int = 0) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Generates the dimension members and their fixed attributes.
+
+    Args:
+        carriers (int): Number of carriers.
+        customers (int): Number of customers.
+        products (int): Number of products.
+        cities (int): Number of cities, shared by customers and carrier routes.
+        categories (int): Number of product categories.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict[str, dict[str, np.ndarray]]: Attribute arrays per dimension, indexed by member.
+    """
+    rng = np.random.default_rng(seed)
+    city_country = COUNTRIES[rng.integers(0, len(COUNTRIES), cities)]
+    city_state = np.array([f"State{i % max(cities // 5, 1)}" for i in range(cities)], dtype=object)
+
+    return {
+        "city": {"name": _names("City", cities), "state": city_state, "country": city_country},
+        "carrier": {
+            "name": _names("Carrier", carriers),
+            "rating": rng.integers(1, 6, carriers),
+            "origin": rng.integers(0, cities, carriers),
+            "destination": rng.integers(0, cities, carriers),
+        },
+        "customer": {
+            "name": _names("Customer", customers),
+            "segment": SEGMENTS[rng.integers(0, len(SEGMENTS), customers)],
+            "payment": PAYMENT_METHODS[rng.integers(0, len(PAYMENT_METHODS), customers)],
+            "city": rng.integers(0, cities, customers),
+        },
+        "product": {
+            "name": _names("Product", products),
+            "unit_price": rng.integers(1, 500, products),
+            "category": _names("Category", categories)[rng.integers(0, categories, products)],
+        },
+    }
+
+
+def sample_shipments(rows: int, members: dict[str, dict[str, np.ndarray]], days: int = 365,
+                     start_date: str = "2023-01-01", skew: float = 1.0, first_shipment_id: int = 1,
+                     seed: int = 0) -> pd.DataFrame:
+    """
+    Draws shipment rows from the given dimension members.
+
+    Args:
+        rows (int): Number of shipments.
+        members (dict): Dimension members, from `shipment_members`.
+        days (int): Number of distinct shipment dates, starting at `start_date`.
+        start_date (str): First shipment date.
+        skew (float): Zipf exponent of customer, product and carrier popularity; 0 draws
+            members uniformly.
+        first_shipment_id (int): `shipment_id` of the first row.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: Shipments with the columns of the source CSV.
+    """
+    rng = np.random.default_rng(seed)
+    city, carrier = members["city"], members["carrier"]
+    customer, product = members["customer"], members["product"]
+
+    def draw(dimension: dict[str, np.ndarray]) -> np.ndarray:
+        count = len(dimension["name"])
+        return rng.choice(count, rows, p=_weights(count, skew))
+
+    carrier_idx, customer_idx, product_idx = draw(carrier), draw(customer), draw(product)
+    customer_city = customer["city"][customer_idx]
+    origin, destination = carrier["origin"][carrier_idx], carrier["destination"][carrier_idx]
+    quantity = rng.integers(1, 10, rows)
+    unit_price = product["unit_price"][product_idx]
+
+    shipment_date = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+    delivery_date = shipment_date + pd.to_timedelta(rng.integers(1, 8, rows), unit="D")
+
+    return pd.DataFrame({
+        "shipment_id": np.arange(first_shipment_id, first_shipment_id + rows),
+        "total_cost": (quantity * unit_price * rng.uniform(0.9, 1.2, rows)).round(2),
+        "quantity": quantity,
+        "product_name": product["name"][product_idx],
+        "unit_price": unit_price,
+        "category": product["category"][product_idx],
+        "customer_name": customer["name"][customer_idx],
+        "customer_segment": customer["segment"][customer_idx],
+        "payment_method": customer["payment"][customer_idx],
+        "customer_city": city["name"][customer_city],
+        "customer_state": city["state"][customer_city],
+        "customer_country": city["country"][customer_city],
+        "carrier_name": carrier["name"][carrier_idx],
+        "carrier_rating": carrier["rating"][carrier_idx],
+        "destination_city": city["name"][destination],
+        "destination_state": city["state"][destination],
+        "destination_country": city["country"][destination],
+        "origin_city": city["name"][origin],
+        "origin_state": city["state"][origin],
+        "origin_country": city["country"][origin],
+        "shipment_date": shipment_date,
+        "delivery_date": delivery_date,
+        "mode_of_transport": TRANSPORT_MODES[rng.integers(0, len(TRANSPORT_MODES), rows)],
+        "shipping_priority": PRIORITIES[rng.integers(0, len(PRIORITIES), rows)],
+    })
+
+
+def generate_shipments(rows: int, carriers: int = 20, customers: int = 5000, products: int = 200,
+                       cities: int = 50, days: int = 365, start_date: str = "2023-01-01",
+                       skew: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a synthetic shipment DataFrame with the columns of the source CSV.
+
+    Args:
+        rows (int): Number of shipments.
+        carriers (int): Number of carriers.
+        customers (int): Number of customers.
+        products (int): Number of products.
+        cities (int): Number of cities.
+        days (int): Number of distinct shipment dates.
+        start_date (str): First shipment date.
+        skew (float): Zipf exponent of member popularity; 0 draws members uniformly.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: The generated shipments.
+    """
+    members = shipment_members(carriers, customers, products, cities, seed=seed)
+    return sample_shipments(rows, members, days, start_date, skew, seed=seed)
+
+
+def write_shipments_csv(path: str, rows: int, chunk_rows: int = 1_000_000, carriers: int = 20,
+                        customers: int = 5000, products: int = 200, cities: int = 50, days: int = 365,
+                        start_date: str = "2023-01-01", skew: float = 1.0, seed: int = 0) -> None:
+    """
+    Writes synthetic shipments to a CSV file, `chunk_rows` at a time.
+
+    Every chunk draws from the same dimension members and continues the shipment IDs,
+    so the file is the same as one generated at once, whatever its size.
+
+    Args:
+        path (str): CSV file to write.
+        rows (int): Number of shipments.
+        chunk_rows (int): Number of shipments generated and written at a time.
+        carriers, customers, products, cities, days, start_date, skew, seed: See
+            `generate_shipments`.
+    """
+    members = shipment_members(carriers, customers, products, cities, seed=seed)
+    for chunk, first in enumerate(range(0, rows, chunk_rows)):
+        chunk_df = sample_shipments(min(chunk_rows, rows - first), members, days, start_date, skew,
+                                    first_shipment_id=first + 1, seed=seed + chunk)
+        chunk_df.to_csv(path, mode="w" if chunk == 0 else "a", header=chunk == 0, index=False,
+                        date_format="%Y-%m-%d")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="CSV file to write.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of shipments.")
+    parser.add_argument("--carriers", type=int, default=20, help="Number of carriers.")
+    parser.add_argument("--customers", type=int, default=5000, help="Number of customers.")
+    parser.add_argument("--products", type=int, default=200, help="Number of products.")
+    parser.add_argument("--cities", type=int, default=50, help="Number of cities.")
+    parser.add_argument("--days", type=int, default=365, help="Number of distinct shipment dates.")
+    parser.add_argument("--start-date", default="2023-01-01", help="First shipment date.")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of member popularity (0: uniform).")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="Rows generated and written at a time.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    write_shipments_csv(args.path, args.rows, args.chunk_rows, args.carriers, args.customers, args.products,
+                        args.cities, args.days, args.start_date, args.skew, args.seed)
+    print(f"Wrote {args.rows} shipments to {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from sqlalchemy import select, text
+from database.create_table import Fact
+from dataload.instrumentation import instrumented
+
+# Summary tables kept for the standard reports, keyed by the report name in REPORT_QUERIES.
+# `delta` aggregates the facts with sales_id >= :sales_id_start, i.e. those added by a load;
+# `route` answers the report from the summary table.
+AGGREGATES = {
+    "revenue_by_segment": {
+        "table": "agg_revenue_by_segment",
+        "keys": ["customer_segment"],
+        "values": ["total_revenue"],
+        "delta": """
+            SELECT c.customer_segment, sum(f.total_cost)
+            FROM fact_sales_table f
+            INNER JOIN dim_customer c ON c.customer_id = f.customer_id
+            WHERE f.sales_id >= :sales_id_start
+            GROUP BY c.customer_segment
+            """,
+        "route": "SELECT customer_segment, total_revenue FROM agg_revenue_by_segment",
+    },
+    "cost_by_carrier": {
+        "table": "agg_cost_by_carrier",
+        "keys": ["carrier_name"],
+        "values": ["total_cost"],
+        "delta": """
+            SELECT c.carrier_name, sum(f.total_cost)
+            FROM fact_sales_table f
+            INNER JOIN dim_courier c ON f.courier_id = c.courier_id
+            WHERE f.sales_id >= :sales_id_start
+            GROUP BY c.carrier_name
+            """,
+        "route": "SELECT carrier_name, total_cost FROM agg_cost_by_carrier",
+    },
+    "quantity_by_month_weekday": {
+        "table": "agg_quantity_by_month_weekday",
+        "keys": ["month", "week_day"],
+        "values": ["quantity_sum", "shipment_count"],
+        "delta": """
+            SELECT d.month, d.week_day, sum(f.quantity), count(*)
+            FROM fact_sales_table f
+            INNER JOIN dim_shipment_date ds ON ds.shipment_date_id = f.shipment_date_id
+            INNER JOIN dim_date d ON d.date_id = ds.date_id
+            WHERE f.sales_id >= :sales_id_start
+            GROUP BY d.month, d.week_day
+            """,
+        "route": """
+            SELECT month, week_day, quantity_sum / shipment_count AS avg_quantity_shipped
+            FROM agg_quantity_by_month_weekday
+            """,
+    },
+}
+
+
+@instrumented()
+def update_aggregates(connection, sales_id_start: int) -> None:
+    """
+    Adds the facts of the current load to the summary tables.
+
+    Only the new facts (`sales_id >= sales_id_start`) are aggregated and merged into
+    the existing totals with `INSERT ... ON CONFLICT DO UPDATE`, so the cost follows
+    the size of the load, not of the fact table. A summary table that is still empty
+    while older facts exist (e.g. a warehouse loaded before it was added) is computed
+    from every fact instead.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction, after
+            the load's facts are inserted; the caller commits.
+        sales_id_start (int): First `sales_id` of the current load.
+    """
+    has_older_facts = connection.execute(
+        select(Fact.sales_id).where(Fact.sales_id < sales_id_start).limit(1)).first() is not None
+
+    for aggregate in AGGREGATES.values():
+        table = aggregate["table"]
+        start = sales_id_start
+        if has_older_facts and connection.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is None:
+            start = 0
+
+        columns = ", ".join(aggregate["keys"] + aggregate["values"])
+        updates = ", ".join(f"{value} = {table}.{value} + excluded.{value}" for value in aggregate["values"])
+        connection.execute(text(f"""
+            INSERT INTO {table} ({columns})
+            {aggregate["delta"]}
+            ON CONFLICT ({", ".join(aggregate["keys"])}) DO UPDATE SET {updates}
+            """), {"sales_id_start": start})
+
+
+@instrumented()
+def rebuild_aggregates(connection) -> None:
+    """
+    Recomputes the summary tables from every fact.
+
+    Needed when facts are removed rather than added (e.g. by `detach_month`), which
+    `update_aggregates` cannot merge: a total may drop to nothing, and its row must go.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction, after
+            the facts are removed; the caller commits.
+    """
+    for aggregate in AGGREGATES.values():
+        table = aggregate["table"]
+        columns = ", ".join(aggregate["keys"] + aggregate["values"])
+        connection.execute(text(f"DELETE FROM {table}"))
+        connection.execute(text(f"INSERT INTO {table} ({columns}) {aggregate['delta']}"), {"sales_id_start": 0})
@@ -0,0 +1,109 @@
+import io
+import pandas as pd
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Engine
+
+
+def transactional(engine: Engine) -> Engine:
+    """
+    Returns a copy of the engine whose connections run inside a transaction.
+
+    `db_connection` creates its engine in AUTOCOMMIT mode, under which every insert
+    would be committed on its own. Loads use this copy so that all tables are
+    committed together, or not at all.
+
+    Args:
+        engine (Engine): SQLAlchemy engine object for the database.
+
+    Returns:
+        Engine: Engine sharing the same pool but without autocommit.
+    """
+    isolation_level = "READ COMMITTED" if engine.dialect.name == "postgresql" else "SERIALIZABLE"
+    return engine.execution_options(isolation_level=isolation_level)
+
+
+def _table_frame(table: Table, frame: pd.DataFrame) -> pd.DataFrame:
+    """Selects the frame columns that exist in the table, in table order."""
+    return frame[[column.name for column in table.columns if column.name in frame.columns]]
+
+
+def _copy_postgres(connection: Connection, table: Table, frame: pd.DataFrame, skip_existing: bool) -> None:
+    """Streams the frame into the table with COPY FROM STDIN from an in-memory CSV."""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d")
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{name}"' for name in frame.columns)
+    # COPY cannot skip conflicting rows, so those loads go through a staging table
+    target = f"{table.name}_staging" if skip_existing else table.name
+    copy_sql = f'COPY "{target}" ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    driver_connection = connection.connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        if skip_existing:
+            cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS "{target}" '
+                           f'(LIKE "{table.name}" INCLUDING DEFAULTS) ON COMMIT DROP')
+
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+
+        if skip_existing:
+            cursor.execute(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{target}" '
+                           f'ON CONFLICT DO NOTHING')
+            cursor.execute(f'TRUNCATE "{target}"')
+
+
+def _executemany(connection: Connection, table: Table, frame: pd.DataFrame, skip_existing: bool) -> None:
+    """Inserts the frame with a single DBAPI executemany over row tuples."""
+    for name in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[name]):
+            frame = frame.assign(**{name: frame[name].dt.strftime("%Y-%m-%d")})
+    if frame.isna().any().any():
+        frame = frame.astype(object).where(frame.notna(), None)
+
+    columns = ", ".join(f'"{name}"' for name in frame.columns)
+    marker = "?" if connection.dialect.dbapi.paramstyle == "qmark" else "%s"
+    placeholders = ", ".join(marker for _ in frame.columns)
+    insert_sql = f'INSERT INTO "{table.name}" ({columns}) VALUES ({placeholders})'
+    if skip_existing:
+        insert_sql += " ON CONFLICT DO NOTHING"
+
+    driver_connection = connection.connection.driver_connection
+    cursor = driver_connection.cursor()
+    try:
+        cursor.executemany(insert_sql, frame.itertuples(index=False, name=None))
+    finally:
+        cursor.close()
+
+
+def copy_frame(connection: Connection, table: Table, frame: pd.DataFrame, skip_existing: bool = False) -> None:
+    """
+    Bulk-loads a DataFrame into a table without building per-row dicts.
+
+    On PostgreSQL the frame is streamed with `COPY FROM STDIN`; other databases
+    (e.g. SQLite for local runs) fall back to the driver's `executemany`. The rows are
+    written on the connection's current transaction, which the caller commits.
+
+    With `skip_existing`, rows whose primary key is already in the table are skipped
+    (`ON CONFLICT DO NOTHING`); on PostgreSQL they are copied to a temporary staging
+    table first.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction.
+        table (Table): Target table.
+        frame (pd.DataFrame): Rows to load; columns not in the table are ignored.
+        skip_existing (bool): Skip rows that conflict with existing rows instead of failing.
+    """
+    frame = _table_frame(table, frame)
+    if frame.empty:
+        return
+
+    if connection.dialect.name == "postgresql":
+        _copy_postgres(connection, table, frame, skip_existing)
+    else:
+        _executemany(connection, table, frame, skip_existing)
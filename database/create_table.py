@@ -1,4 +1,5 @@
-from sqlalchemy import  Column, Integer, ForeignKey, String, DATE, Float
+from sqlalchemy import  Column, Integer, BigInteger, ForeignKey, String, DATE, Float, DateTime, Index, MetaData, \
+    PrimaryKeyConstraint, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -35,7 +36,7 @@ class Shipment(Base):
     shipment_date_id = Column(Integer, primary_key=True)
     time = relationship("Time")
     date_id = Column(Integer, ForeignKey("dim_date.date_id", ondelete='CASCADE', 
-                                         onupdate='CASCADE'), nullable=False)
+                                         onupdate='CASCADE'), nullable=False, index=True)
     
 class Time(Base): 
     __tablename__ = "dim_date"
@@ -123,67 +124,257 @@ class PriorTransport(Base):
 
 class Fact(Base): 
     __tablename__ = "fact_sales_table"
+    # Every foreign key is indexed for the report joins; the composite index covers the 
+    # quantity-by-shipment-date report without reading the table
+    __table_args__ = (Index("ix_fact_sales_table_shipment_date_quantity", "shipment_date_id", "quantity"),)
     sales_id = Column(Integer, primary_key=True)
     quantity = Column(Integer)
     total_cost = Column(Float)
     courier = relationship("Courier")
     courier_id = Column(Integer, ForeignKey("dim_courier.courier_id", ondelete='CASCADE', 
-                                            onupdate='CASCADE'), nullable=False)
+                                            onupdate='CASCADE'), nullable=False, index=True)
     
     shipment = relationship('Shipment')
     shipment_date_id = Column(Integer, ForeignKey("dim_shipment_date.shipment_date_id", ondelete='CASCADE', 
-                                         onupdate='CASCADE'), nullable=False)
+                                         onupdate='CASCADE'), nullable=False, index=True)
     
     delivery = relationship('Delivery')
     delivery_date_id = Column(Integer, ForeignKey("dim_delivery_date.delivery_date_id", ondelete='CASCADE', 
-                                         onupdate='CASCADE'), nullable=False)
+                                         onupdate='CASCADE'), nullable=False, index=True)
     
     product = relationship('Product')
     product_id = Column( Integer, ForeignKey("dim_product.product_id", ondelete='CASCADE', 
-                                             onupdate='CASCADE'), nullable=False)
+                                             onupdate='CASCADE'), nullable=False, index=True)
     
     customer = relationship('Customer')
     customer_id = Column(Integer, ForeignKey("dim_customer.customer_id", ondelete='CASCADE', 
-                                             onupdate='CASCADE'), nullable=False)
+                                             onupdate='CASCADE'), nullable=False, index=True)
      
     shipping = relationship("Shipping")
     shipment_id = Column(Integer, ForeignKey("dim_shipping.shipment_id", ondelete='CASCADE', 
-                                             onupdate='CASCADE'), nullable=False)
+                                             onupdate='CASCADE'), nullable=False, index=True)
     
     
 
-def create_db_table(engine): 
+class RevenueBySegment(Base): 
+    # Pre-aggregated report tables, updated from the facts of each load
+    __tablename__ = "agg_revenue_by_segment"
+    customer_segment = Column(String(40), primary_key=True)
+    total_revenue = Column(Float, nullable=False)
+
+
+class CostByCarrier(Base): 
+    __tablename__ = "agg_cost_by_carrier"
+    carrier_name = Column(String(40), primary_key=True)
+    total_cost = Column(Float, nullable=False)
+
+
+class QuantityByMonthWeekday(Base): 
+    # Sum and count rather than the average, so that new facts can be added to them
+    __tablename__ = "agg_quantity_by_month_weekday"
+    month = Column(Integer, primary_key=True)
+    week_day = Column(String(15), primary_key=True)
+    quantity_sum = Column(Float, nullable=False)
+    shipment_count = Column(Integer, nullable=False)
+
+
+class KeyRegistryEntry(Base): 
+    # Natural key -> surrogate key of every dimension member ever loaded. Not dropped 
+    # with the star schema, so members keep their keys across runs.
+    __tablename__ = "key_registry"
+    dimension = Column(String(40), primary_key=True)
+    natural_key = Column(String(400), primary_key=True)
+    surrogate_key = Column(Integer, nullable=False)
+
+
+class LoadVersion(Base): 
+    # One row per committed load; the highest version identifies the data currently loaded. 
+    # Not dropped with the star schema, so versions keep increasing across rebuilds.
+    __tablename__ = "load_version"
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    loaded_at = Column(DateTime, nullable=False)
+
+
+class LoadAuditFile(Base): 
+    # Content hash of every source file fully loaded; dropped with the star schema, whose 
+    # rows it vouches for
+    __tablename__ = "load_audit_file"
+    file_hash = Column(String(64), primary_key=True)
+    source_path = Column(String(400), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    loaded_at = Column(DateTime, nullable=False)
+
+
+class LoadAuditBlock(Base): 
+    # Content hash of every block of source rows loaded, committed with the block's rows
+    __tablename__ = "load_audit_block"
+    block_hash = Column(String(64), primary_key=True)
+    source_path = Column(String(400), nullable=False)
+    block_number = Column(Integer, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    loaded_at = Column(DateTime, nullable=False)
+
+
+
+# Denormalized copies of the snowflaked dimensions, filled when a load flattens the schema 
+# (see `dataload.flat_tables`): one join per dimension instead of up to three. The calendar 
+# needs none, as `dim_date.date_id` is the same `yyyymmdd` key as both fact date keys.
+class StarCourier(Base): 
+    __tablename__ = "star_courier"
+    courier_id = Column(Integer, primary_key=True)
+    carrier_name = Column(String(40))
+    carrier_rating = Column(Integer)
+    origin_city = Column(String(50))
+    origin_state = Column(String(50))
+    origin_country = Column(String(50))
+    destination_city = Column(String(50))
+    destination_state = Column(String(50))
+    destination_country = Column(String(50))
+
+
+class StarCustomer(Base): 
+    __tablename__ = "star_customer"
+    customer_id = Column(Integer, primary_key=True)
+    customer_name = Column(String(40))
+    customer_segment = Column(String(40))
+    payment_method = Column(String(40))
+    customer_city = Column(String(40))
+    customer_state = Column(String(40))
+    customer_country = Column(String(40))
+
+
+class StarProduct(Base): 
+    __tablename__ = "star_product"
+    product_id = Column(Integer, primary_key=True)
+    product_name = Column(String(40))
+    unit_price = Column(Integer)
+    category = Column(String(40))
+
+
+class StarShipping(Base): 
+    __tablename__ = "star_shipping"
+    shipment_id = Column(Integer, primary_key=True)
+    mode_of_transport = Column(String(20))
+    shipping_priority = Column(String(20))
+
+
+class ReportShipment(Base): 
+    # One row per fact with every dimension attribute, for reports without joins
+    __tablename__ = "report_shipments"
+    sales_id = Column(Integer, primary_key=True)
+    shipment_id = Column(Integer, nullable=False, index=True)
+    quantity = Column(Integer)
+    total_cost = Column(Float)
+    shipment_date_id = Column(Integer, nullable=False, index=True)
+    shipment_date = Column(DATE)
+    shipment_year = Column(Integer)
+    shipment_month = Column(Integer)
+    shipment_week_day = Column(String(15))
+    delivery_date_id = Column(Integer, nullable=False)
+    delivery_date = Column(DATE)
+    carrier_name = Column(String(40))
+    carrier_rating = Column(Integer)
+    origin_city = Column(String(50))
+    origin_state = Column(String(50))
+    origin_country = Column(String(50))
+    destination_city = Column(String(50))
+    destination_state = Column(String(50))
+    destination_country = Column(String(50))
+    customer_name = Column(String(40))
+    customer_segment = Column(String(40))
+    payment_method = Column(String(40))
+    customer_city = Column(String(40))
+    customer_state = Column(String(40))
+    customer_country = Column(String(40))
+    product_name = Column(String(40))
+    unit_price = Column(Integer)
+    category = Column(String(40))
+    mode_of_transport = Column(String(20))
+    shipping_priority = Column(String(20))
+
+def partitioned_fact_table() -> Table:
+    """
+    Returns the fact table declared for PostgreSQL range partitioning by shipment month.
+
+    The copy lives in its own metadata, with the dimension tables it references, and has 
+    `shipment_date_id` (the `yyyymmdd` date key) added to its primary key, as PostgreSQL 
+    requires of the partition key. The monthly partitions are created by 
+    `partitions.ensure_month_partitions`.
+
+    Returns:
+        Table: The partitioned `fact_sales_table`.
+    """
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+
+    fact = metadata.tables["fact_sales_table"]
+    fact.c.shipment_date_id.primary_key = True
+    fact.append_constraint(PrimaryKeyConstraint("sales_id", "shipment_date_id"))
+    fact.dialect_kwargs["postgresql_partition_by"] = "RANGE (shipment_date_id)"
+    return fact
+
+
+def create_db_table(engine, rebuild: bool = True, partition_by_month: bool = False): 
     """
     Creates database tables based on SQLAlchemy ORM metadata.
 
     This function drops existing tables (if any) and creates new tables based on the SQLAlchemy ORM metadata defined in Base.
+    The `key_registry` and `load_version` tables are kept, so dimension members keep their 
+    surrogate keys and load versions keep increasing.
 
     Args:
         engine (Engine): SQLAlchemy engine object for the database.
+        rebuild (bool): Drop the existing tables first. When False, existing tables and 
+            their rows are kept and only missing tables are created (incremental loads).
+        partition_by_month (bool): Create `fact_sales_table` range-partitioned by shipment 
+            month (PostgreSQL only; ignored on other databases). An existing fact table 
+            is kept as it is.
 
     Raises:
         Exception: If an error occurs during the table creation process.
     """
     try: 
         # Drop existing tables
-        Base.metadata.drop_all(engine, 
-                               tables=[Base.metadata.tables["dim_category"], 
-                                       Base.metadata.tables["dim_product"],
-                                       Base.metadata.tables["dim_date"],
-                                       Base.metadata.tables["dim_delivery_date"], 
-                                       Base.metadata.tables["dim_shipment_date"],
-                                       Base.metadata.tables["dim_courier_destination"], 
-                                       Base.metadata.tables["dim_courier_origin"], 
-                                       Base.metadata.tables["dim_courier"],
-                                       Base.metadata.tables["dim_customer_city"], 
-                                       Base.metadata.tables["dim_customer_payment"], 
-                                       Base.metadata.tables["dim_customer"],
-                                       Base.metadata.tables["fact_sales_table"],
-                                       Base.metadata.tables["dim_shipping"], 
-                                       Base.metadata.tables["dim_priority_transport"], 
-                                       Base.metadata.tables["dim_country"]]) 
+        if rebuild:
+            Base.metadata.drop_all(engine, 
+                                   tables=[Base.metadata.tables["dim_category"], 
+                                           Base.metadata.tables["dim_product"],
+                                           Base.metadata.tables["dim_date"],
+                                           Base.metadata.tables["dim_delivery_date"], 
+                                           Base.metadata.tables["dim_shipment_date"],
+                                           Base.metadata.tables["dim_courier_destination"], 
+                                           Base.metadata.tables["dim_courier_origin"], 
+                                           Base.metadata.tables["dim_courier"],
+                                           Base.metadata.tables["dim_customer_city"], 
+                                           Base.metadata.tables["dim_customer_payment"], 
+                                           Base.metadata.tables["dim_customer"],
+                                           Base.metadata.tables["fact_sales_table"],
+                                           Base.metadata.tables["dim_shipping"], 
+                                           Base.metadata.tables["dim_priority_transport"], 
+                                           Base.metadata.tables["dim_country"],
+                                           Base.metadata.tables["agg_revenue_by_segment"],
+                                           Base.metadata.tables["agg_cost_by_carrier"],
+                                           Base.metadata.tables["agg_quantity_by_month_weekday"],
+                                           Base.metadata.tables["load_audit_file"],
+                                           Base.metadata.tables["load_audit_block"],
+                                           Base.metadata.tables["star_courier"],
+                                           Base.metadata.tables["star_customer"],
+                                           Base.metadata.tables["star_product"],
+                                           Base.metadata.tables["star_shipping"],
+                                           Base.metadata.tables["report_shipments"]]) 
         # Create new tables
-        Base.metadata.create_all(engine)
+        if partition_by_month and engine.dialect.name == "postgresql":
+            Base.metadata.create_all(engine, tables=[table for table in Base.metadata.sorted_tables 
+                                                     if table.name != "fact_sales_table"])
+            partitioned_fact_table().create(engine, checkfirst=True)
+        else:
+            Base.metadata.create_all(engine)
+
+        # Tables kept from earlier runs do not get the indexes added to their models since
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
         
     except Exception as e: 
         raise Exception(f"Error creating tables: {e}")
\ No newline at end of file
@@ -1,14 +1,24 @@
 from sqlalchemy import create_engine
 
-def db_connection(username, password, host, db_name): 
+def db_connection(username, password, host, db_name, echo=False, pool_size=5, max_overflow=10, 
+                  pool_timeout=30, pool_recycle=1800, pool_pre_ping=True): 
     """
     Establishes a connection to a PostgreSQL database.
 
+    The engine keeps a pool of connections, so concurrent queries (see 
+    `database.query_runner`) each check out their own connection instead of sharing one.
+
     Args:
         username (str): Username for database authentication.
         password (str): Password for database authentication.
         host (str): Hostname or IP address of the PostgreSQL server.
         db_name (str): Name of the database to connect to.
+        echo (bool): Log every SQL statement; off by default since the logging itself is costly.
+        pool_size (int): Number of connections kept open in the pool.
+        max_overflow (int): Connections opened beyond `pool_size` under load.
+        pool_timeout (int): Seconds to wait for a free connection before failing.
+        pool_recycle (int): Seconds after which a pooled connection is replaced.
+        pool_pre_ping (bool): Check that a pooled connection is alive before using it.
 
     Returns:
         tuple: A tuple containing the database connection and the SQLAlchemy engine.
@@ -20,8 +30,10 @@ def db_connection(username, password, host, db_name):
         # Construct the connection string
         conn_str = f'postgresql+psycopg2://{username}:{password}@{host}:5432/{db_name}' 
         
-        # Create an SQLAlchemy engine
-        engine = create_engine(conn_str, echo=True, isolation_level = "AUTOCOMMIT")
+        # Create an SQLAlchemy engine backed by a connection pool
+        engine = create_engine(conn_str, echo=echo, isolation_level = "AUTOCOMMIT", pool_size=pool_size, 
+                               max_overflow=max_overflow, pool_timeout=pool_timeout, 
+                               pool_recycle=pool_recycle, pool_pre_ping=pool_pre_ping)
         
         # Connect to the database
         connection = engine.connect()
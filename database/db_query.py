@@ -1,14 +1,88 @@
+import hashlib
+import re
+import time
+from typing import Iterator
 from sqlalchemy import text
 import pandas as pd
+from database.aggregates import AGGREGATES
+from database.report_queries import REPORT_QUERIES
+from database.query_log import log_query, query_log_enabled
+from database.duckdb_warehouse import duckdb_query, is_duckdb
 
 
-def query_table(query_statement: str, connection) -> pd.DataFrame:
+def normalize_sql(query_statement: str) -> str:
+  """
+  Normalizes a SQL statement so that formatting differences compare equal.
+
+  Runs of whitespace outside string literals collapse to one space, and leading and
+  trailing whitespace and semicolons are removed.
+
+  Args:
+      query_statement (str): SQL query statement.
+
+  Returns:
+      str: The normalized statement.
+  """
+
+  parts = query_statement.strip().rstrip(";").split("'")
+  # Even parts are outside string literals
+  parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+  return "'".join(parts).strip()
+
+
+def statement_fingerprint(query_statement: str) -> str:
+  """
+  Identifies a statement independently of its formatting and literal values.
+
+  The statement is normalized with `normalize_sql`, and its string and number literals 
+  are replaced with `?`, so runs of the same query with different values (or bound 
+  parameters) share a fingerprint.
+
+  Args:
+      query_statement (str): SQL query statement.
+
+  Returns:
+      str: The first 16 hex digits of the SHA-256 of the normalized statement.
+  """
+
+  template = re.sub(r"'(?:[^']|'')*'", "?", normalize_sql(query_statement))
+  template = re.sub(r"(?<![\w:])\d+(?:\.\d+)?\b", "?", template)
+  return hashlib.sha256(template.lower().encode()).hexdigest()[:16]
+
+
+# Report statements that are answered from their summary table instead
+_AGGREGATE_ROUTES = {normalize_sql(REPORT_QUERIES[name]): aggregate["route"] for name, aggregate in AGGREGATES.items()}
+
+
+def route_query(query_statement: str) -> str:
+  """
+  Returns the summary-table statement for a standard report, or the statement unchanged.
+
+  Args:
+      query_statement (str): SQL query statement.
+
+  Returns:
+      str: The statement to execute.
+  """
+
+  return _AGGREGATE_ROUTES.get(normalize_sql(query_statement), query_statement)
+
+
+def query_table(query_statement: str, connection, params: dict | None = None, 
+                use_aggregates: bool = True) -> pd.DataFrame:
   """
   Executes a SQL query statement and returns the result as a DataFrame.
 
+  When the query log is on (see `configure_query_log`), the statement's latency, row 
+  count and result size are logged, with its plan if it was slow.
+
   Args:
       query_statement (str): SQL query statement to execute.
-      connection (Any): A database connection object (can vary depending on the database library).
+      connection (Any): A database connection object (can vary depending on the database library), 
+          or a DuckDB connection from `ParquetWarehouse.connect`.
+      params (dict | None): Values for the statement's bound parameters (`:name`).
+      use_aggregates (bool): Answer the standard reports from their summary tables 
+          (the Parquet warehouse has none and always runs the statement itself).
 
   Returns:
       pd.DataFrame: DataFrame containing the query result.
@@ -19,13 +93,67 @@ def query_table(query_statement: str, connection) -> pd.DataFrame:
 
   try:
       # Execute the SQL query statement
-      result = connection.execute(text(query_statement))
+      duckdb_connection = is_duckdb(connection)
+      if use_aggregates and not duckdb_connection:
+          query_statement = route_query(query_statement)
+      started = time.perf_counter()
+      if duckdb_connection:
+          df_table = duckdb_query(connection, query_statement, params)
+      else:
+          result = connection.execute(text(query_statement), params or {})
 
-      # Fetch all rows and column names from the query result
-      df_table = pd.DataFrame(result.fetchall(), columns=result.keys())
+          # Fetch all rows and column names from the query result
+          df_table = pd.DataFrame(result.fetchall(), columns=result.keys())
+      if query_log_enabled():
+          log_query(connection, query_statement, params, statement_fingerprint(query_statement), 
+                    time.perf_counter() - started, df_table)
       return df_table
 
   except Exception as e:
       # Raise an exception if an error occurs with a more informative message
       raise Exception(f"Error executing query: {query_statement}. Details: {e}")
-        
\ No newline at end of file
+        
+
+def stream_query(query_statement: str, connection, batch_size: int = 10_000,
+                 as_arrow: bool = False) -> Iterator[pd.DataFrame]:
+  """
+  Executes a SQL query statement and yields the result in batches.
+
+  The statement runs on a server-side cursor (`stream_results` / `yield_per`), so
+  only one batch of rows is held in memory at a time, whatever the size of the
+  result.
+
+  Args:
+      query_statement (str): SQL query statement to execute.
+      connection (Any): A database connection object (can vary depending on the database library).
+      batch_size (int): Maximum number of rows per batch.
+      as_arrow (bool): Yield `pyarrow.RecordBatch` objects instead of DataFrames 
+          (requires pyarrow).
+
+  Yields:
+      pd.DataFrame | pyarrow.RecordBatch: Consecutive batches of the query result.
+
+  Raises:
+      Exception: If an error occurs during the query execution.
+  """
+
+  try:
+      if as_arrow:
+          import pyarrow as pa
+
+      # Execute the SQL query statement on a server-side cursor; the options are set on the 
+      # statement, as setting them on the connection would stream every later query too
+      statement = text(query_statement).execution_options(stream_results=True, yield_per=batch_size)
+
+      # The cursor is closed once the result is consumed, or when the caller stops early
+      with connection.execute(statement) as result:
+          columns = list(result.keys())
+
+          # Fetch and convert one batch of rows at a time
+          for rows in result.partitions(batch_size):
+              df_batch = pd.DataFrame(rows, columns=columns)
+              yield pa.RecordBatch.from_pandas(df_batch, preserve_index=False) if as_arrow else df_batch
+
+  except Exception as e:
+      # Raise an exception if an error occurs with a more informative message
+      raise Exception(f"Error executing query: {query_statement}. Details: {e}")
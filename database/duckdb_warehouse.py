@@ -0,0 +1,86 @@
+import glob
+import re
+from contextlib import closing
+from os import listdir
+from os.path import isdir, join
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Directory the Parquet warehouse is written to by default
+WAREHOUSE_DIR = "warehouse"
+
+
+def is_duckdb(connection) -> bool:
+    """Tells whether a connection is a DuckDB connection (see `ParquetWarehouse.connect`)."""
+    return duckdb is not None and isinstance(connection, duckdb.DuckDBPyConnection)
+
+
+def duckdb_sql(query_statement: str) -> str:
+    """Rewrites SQLAlchemy-style bound parameters (`:name`) as DuckDB's (`$name`), leaving `::` casts alone."""
+    return re.sub(r"(?<![:\w]):(\w+)", r"$\1", query_statement)
+
+
+def duckdb_query(connection, query_statement: str, params: dict | None = None) -> pd.DataFrame:
+    """
+    Runs a statement on DuckDB and returns the result as a DataFrame.
+
+    The result is fetched column by column (`.df()`) rather than row by row.
+
+    Args:
+        connection (DuckDBPyConnection): Connection from `ParquetWarehouse.connect`.
+        query_statement (str): SQL statement, with bound parameters as `:name`.
+        params (dict | None): Values of the bound parameters.
+
+    Returns:
+        pd.DataFrame: The result.
+    """
+    return connection.execute(duckdb_sql(query_statement), params or None).df()
+
+
+class ParquetWarehouse:
+    """
+    Queries the tables of a Parquet warehouse in-process with DuckDB.
+
+    Every subdirectory of the warehouse holding Parquet files (as written by
+    `populate_warehouse` or the 'parquet' export) becomes a view of the same name, so
+    the statements written for the database (e.g. `REPORT_QUERIES`) run unchanged.
+    Like an engine, the warehouse hands out connections with `connect`, each usable
+    from its own thread, so `run_queries` and `query_table` work with it as they do
+    with the database. DuckDB scans and aggregates the files on every core.
+    """
+
+    def __init__(self, warehouse_dir: str = WAREHOUSE_DIR, threads: int | None = None) -> None:
+        """
+        Args:
+            warehouse_dir (str): Directory with one subdirectory of Parquet files per table.
+            threads (int | None): Threads DuckDB runs each query on; one per core when None.
+        """
+        if duckdb is None:
+            raise ImportError("the DuckDB warehouse requires duckdb (pip install duckdb)")
+
+        self.warehouse_dir = warehouse_dir
+        self._connection = duckdb.connect()
+        if threads is not None:
+            self._connection.execute(f"SET threads = {int(threads)}")
+
+        for table_name in sorted(listdir(warehouse_dir)):
+            table_dir = join(warehouse_dir, table_name)
+            if isdir(table_dir) and glob.glob(join(table_dir, "*.parquet")):
+                files = join(table_dir, "*.parquet").replace("'", "''")
+                self._connection.execute(f"CREATE VIEW \"{table_name}\" AS SELECT * FROM read_parquet('{files}')")
+
+    def tables(self) -> list[str]:
+        """Returns the names of the warehouse's tables."""
+        return [row[0] for row in self._connection.execute("SELECT view_name FROM duckdb_views() "
+                                                           "WHERE NOT internal ORDER BY view_name").fetchall()]
+
+    def connect(self) -> closing:
+        """Returns a new connection to the warehouse, closed when used as a context manager."""
+        return closing(self._connection.cursor())
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,70 @@
+from sqlalchemy import Index
+from sqlalchemy.engine import Connection, Engine
+from database.create_table import Base
+
+
+def secondary_indexes(table_names: list[str] | None = None) -> list[Index]:
+    """
+    Returns the secondary (non-unique) indexes declared on the ORM models.
+
+    Args:
+        table_names (list[str] | None): Tables to collect the indexes of; all tables when None.
+
+    Returns:
+        list[Index]: The declared indexes.
+    """
+    tables = Base.metadata.sorted_tables
+    if table_names is not None:
+        tables = [table for table in tables if table.name in table_names]
+    return [index for table in tables for index in sorted(table.indexes, key=lambda ix: ix.name) if not index.unique]
+
+
+def drop_indexes(connection: Connection, indexes: list[Index]) -> None:
+    """
+    Drops indexes ahead of a bulk load, so the rows are not indexed one at a time.
+
+    Run this inside the load's transaction: if the load is rolled back, so are the drops.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction.
+        indexes (list[Index]): Indexes to drop; missing ones are skipped.
+    """
+    for index in indexes:
+        index.drop(connection, checkfirst=True)
+
+
+def create_indexes(engine: Engine, indexes: list[Index], concurrently: bool = True) -> None:
+    """
+    Builds indexes after a bulk load.
+
+    On PostgreSQL the indexes are built with `CREATE INDEX CONCURRENTLY` by default, so
+    the tables stay writable and readable while they build; this has to run outside a
+    transaction, after the load is committed. PostgreSQL cannot build the index of a 
+    partitioned table concurrently, so those are built the regular way (which builds 
+    the index of every partition).
+
+    Args:
+        engine (Engine): SQLAlchemy engine object for the database.
+        indexes (list[Index]): Indexes to build; existing ones are skipped.
+        concurrently (bool): Build concurrently where the database supports it.
+
+    Raises:
+        Exception: If an error occurs while building an index.
+    """
+    try:
+        if concurrently and engine.dialect.name == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                partitioned = set(connection.exec_driver_sql(
+                    "SELECT partrelid::regclass::text FROM pg_partitioned_table").scalars())
+                for index in indexes:
+                    columns = ", ".join(f'"{column.name}"' for column in index.columns)
+                    concurrent = "" if index.table.name in partitioned else " CONCURRENTLY"
+                    connection.exec_driver_sql(f'CREATE INDEX{concurrent} IF NOT EXISTS "{index.name}" '
+                                               f'ON "{index.table.name}" ({columns})')
+        else:
+            with engine.begin() as connection:
+                for index in indexes:
+                    index.create(connection, checkfirst=True)
+
+    except Exception as e:
+        raise Exception(f"Error creating indexes: {e}")
@@ -0,0 +1,149 @@
+import hashlib
+from datetime import datetime, timezone
+from os.path import abspath, getsize
+from typing import Iterator
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+from database.create_table import LoadAuditBlock, LoadAuditFile
+
+# Rows per fingerprinted block when a whole file is loaded at once
+BLOCK_ROWS = 100_000
+
+
+def file_fingerprint(path: str, read_size: int = 1 << 20) -> str:
+    """
+    Computes the SHA-256 of a file's content.
+
+    Args:
+        path (str): File to hash.
+        read_size (int): Bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source_file:
+        while chunk := source_file.read(read_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def block_fingerprint(block_df: pd.DataFrame) -> str:
+    """
+    Computes a content hash of a block of source rows.
+
+    Rows are hashed by value with `pd.util.hash_pandas_object`, so the same rows hash
+    the same however the block was read: the columns are hashed in name order and
+    their dtypes normalized (see `_normalized`), so neither the column order nor the
+    CSV parser (e.g. categoricals with different categories, another datetime unit)
+    changes the hash.
+
+    Args:
+        block_df (pd.DataFrame): Rows of source data.
+
+    Returns:
+        str: The hex digest.
+    """
+    block_df = _normalized(block_df[sorted(block_df.columns)])
+    digest = hashlib.sha256(",".join(block_df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(block_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _normalized(block_df: pd.DataFrame) -> pd.DataFrame:
+    """Casts the columns whose hash depends on the dtype's width or unit to one dtype per kind."""
+    columns = {}
+    for column, values in block_df.items():
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.as_unit("ns")
+        elif pd.api.types.is_float_dtype(values):
+            values = values.astype("float64")
+        columns[column] = values
+    return pd.DataFrame(columns)
+
+
+def split_blocks(data_df: pd.DataFrame, block_rows: int = BLOCK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yields consecutive blocks of at most `block_rows` rows."""
+    for start in range(0, len(data_df), block_rows):
+        yield data_df.iloc[start:start + block_rows]
+
+
+def file_ingested(engine: Engine, file_hash: str) -> bool:
+    """
+    Tells whether a file with this content was already loaded completely.
+
+    Args:
+        engine (Engine): SQLAlchemy engine object for the database.
+        file_hash (str): Hash from `file_fingerprint`.
+
+    Returns:
+        bool: True if the file is in the load audit.
+    """
+    with engine.connect() as connection:
+        return connection.execute(select(LoadAuditFile.file_hash)
+                                  .where(LoadAuditFile.file_hash == file_hash)).first() is not None
+
+
+def record_file(engine: Engine, path: str, file_hash: str) -> None:
+    """
+    Adds a fully loaded file to the load audit.
+
+    Args:
+        engine (Engine): SQLAlchemy engine object for the database.
+        path (str): Path of the loaded file.
+        file_hash (str): Hash from `file_fingerprint`.
+    """
+    with engine.begin() as connection:
+        if connection.execute(select(LoadAuditFile.file_hash).where(LoadAuditFile.file_hash == file_hash)).first() is None:
+            connection.execute(insert(LoadAuditFile).values(file_hash=file_hash, source_path=abspath(path),
+                                                            size_bytes=getsize(path),
+                                                            loaded_at=datetime.now(timezone.utc)))
+
+
+class BlockAudit:
+    """
+    Skips blocks of source rows that were already loaded, and records the new ones.
+
+    Blocks are identified by `block_fingerprint`. New blocks are recorded in the load's
+    own transaction, so a block is marked loaded exactly when its rows are committed; a
+    failed or killed load leaves its blocks unmarked and they are processed again.
+    """
+
+    def __init__(self, source_path: str = "") -> None:
+        """
+        Args:
+            source_path (str): Path of the source the blocks come from, for the audit rows.
+        """
+        self.source_path = abspath(source_path) if source_path else ""
+        self._seen: set[str] = set()
+        self._blocks: list[dict] = []
+
+    def is_new(self, connection: Connection, block_df: pd.DataFrame, block_number: int) -> bool:
+        """
+        Tells whether a block still has to be loaded, and queues it for `record` if so.
+
+        Args:
+            connection (Connection): SQLAlchemy connection to the database.
+            block_df (pd.DataFrame): Rows of source data.
+            block_number (int): Position of the block in its source.
+
+        Returns:
+            bool: False if the same rows were loaded before (or earlier in this load).
+        """
+        block_hash = block_fingerprint(block_df)
+        if block_hash in self._seen or connection.execute(
+                select(LoadAuditBlock.block_hash).where(LoadAuditBlock.block_hash == block_hash)).first():
+            return False
+
+        self._seen.add(block_hash)
+        self._blocks.append({"block_hash": block_hash, "source_path": self.source_path,
+                             "block_number": block_number, "row_count": len(block_df)})
+        return True
+
+    def record(self, connection: Connection) -> None:
+        """Records the queued blocks on the load's connection, with an open transaction the caller commits."""
+        if self._blocks:
+            loaded_at = datetime.now(timezone.utc)
+            connection.execute(insert(LoadAuditBlock), [{**block, "loaded_at": loaded_at} for block in self._blocks])
+            self._blocks = []
@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy import MetaData, Table, inspect, insert, text
+from sqlalchemy.engine import Connection, Engine
+from database.aggregates import rebuild_aggregates
+from database.create_table import Fact, LoadVersion, ReportShipment
+
+FACT_TABLE = "fact_sales_table"
+
+# The wide reporting table (see `flat_tables`) holds a copy of every fact
+REPORT_TABLE = ReportShipment.__tablename__
+
+
+def partition_name(month: int) -> str:
+    """Name of the fact partition of a `yyyymm` month, e.g. `fact_sales_table_202401`."""
+    return f"{FACT_TABLE}_{month}"
+
+
+def month_bounds(month: int) -> tuple[int, int]:
+    """
+    Returns the range of `yyyymmdd` date keys of a `yyyymm` month.
+
+    Args:
+        month (int): Month as `yyyymm`.
+
+    Returns:
+        tuple[int, int]: First date key of the month and of the next month (exclusive).
+    """
+    year, month_of_year = divmod(month, 100)
+    next_month = (year + 1) * 100 + 1 if month_of_year == 12 else month + 1
+    return month * 100 + 1, next_month * 100 + 1
+
+
+def fact_months(fact_df: pd.DataFrame) -> pd.Series:
+    """Returns the `yyyymm` shipment month of every fact row."""
+    return fact_df["shipment_date_id"] // 100
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """
+    Tells whether the fact table is partitioned (see `create_db_table(partition_by_month=True)`).
+
+    Args:
+        connection (Connection): SQLAlchemy connection to the database.
+
+    Returns:
+        bool: True if the fact table is a PostgreSQL partitioned table.
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table_name)"),
+                              {"table_name": FACT_TABLE}).first() is not None
+
+
+def ensure_month_partitions(connection: Connection, months) -> list[str]:
+    """
+    Creates the monthly fact partitions that do not exist yet.
+
+    Run this inside the load's transaction, before inserting the facts: if the load is
+    rolled back, so are the new partitions.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction.
+        months (Iterable[int]): Months as `yyyymm`.
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    created = []
+    for month in sorted(set(int(month) for month in months)):
+        name = partition_name(month)
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+        start, end = month_bounds(month)
+        connection.exec_driver_sql(f'CREATE TABLE "{name}" PARTITION OF "{FACT_TABLE}" '
+                                   f'FOR VALUES FROM ({start}) TO ({end})')
+        created.append(name)
+    return created
+
+
+def partition_frames(fact_df: pd.DataFrame) -> list[tuple[Table, pd.DataFrame]]:
+    """
+    Splits fact rows by shipment month, with the partition table each part goes to.
+
+    Inserting each part into its partition directly spares PostgreSQL routing every row
+    through the partitioned table.
+
+    Args:
+        fact_df (pd.DataFrame): Fact rows.
+
+    Returns:
+        list[tuple[Table, pd.DataFrame]]: The partition table and rows of every month, in month order.
+    """
+    metadata = MetaData()
+    return [(Fact.__table__.to_metadata(metadata, name=partition_name(int(month))), month_df)
+            for month, month_df in fact_df.groupby(fact_months(fact_df), sort=True)]
+
+
+def delete_report_month(connection: Connection, month: int) -> int:
+    """
+    Deletes a month's shipments from the wide reporting table, when it exists.
+
+    Args:
+        connection (Connection): SQLAlchemy connection with an open transaction.
+        month (int): Month as `yyyymm`.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    if not inspect(connection).has_table(REPORT_TABLE):
+        return 0
+    start, end = month_bounds(month)
+    return connection.execute(text(f"DELETE FROM {REPORT_TABLE} WHERE shipment_date_id >= :start "
+                                   f"AND shipment_date_id < :end"), {"start": start, "end": end}).rowcount
+
+
+def detach_month(engine: Engine, month: int) -> str:
+    """
+    Detaches a month's partition from the fact table, e.g. to archive or drop it.
+
+    The partition stays in the database as a plain table holding the month's facts.
+    In the same transaction the month's rows are deleted from the wide reporting table
+    (see `delete_report_month`) and the summary tables are recomputed without the month
+    (see `rebuild_aggregates`), so reports no longer include it, and a new load version
+    is recorded, so cached report results are not served.
+
+    Args:
+        engine (Engine): SQLAlchemy engine object for the database.
+        month (int): Month as `yyyymm`.
+
+    Returns:
+        str: Name of the detached table.
+
+    Raises:
+        Exception: If the partition cannot be detached.
+    """
+    name = partition_name(month)
+    try:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'ALTER TABLE "{FACT_TABLE}" DETACH PARTITION "{name}"')
+            delete_report_month(connection, month)
+            rebuild_aggregates(connection)
+            connection.execute(insert(LoadVersion).values(loaded_at=datetime.now(timezone.utc)))
+    except Exception as e:
+        raise Exception(f"Error detaching partition {name}: {e}")
+    return name
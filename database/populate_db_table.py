@@ -1,59 +1,641 @@
-from sqlalchemy import insert
+import shutil
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects import postgresql, sqlite
 import pandas as pd
+from os.path import isdir, join
 from sqlalchemy.orm import  Session
 from database.create_table import Time, Product, Category, Delivery, Shipment, Courier, Destination, Origin, Customer
-from database.create_table import City, Payment, Fact, Shipping, PriorTransport, Country
-from dataload.tables_data import product_data, customer_data, courier_data
-from dataload.tables_data import date_data, fact_data, shipping_data
+from database.create_table import City, Payment, Fact, Shipping, PriorTransport, Country, KeyRegistryEntry
+from database.create_table import LoadVersion, StarCourier, StarCustomer, StarProduct, StarShipping, ReportShipment
+from dataload.transform_backend import get_backend
+from dataload.export_data import export_tables, export_tables_in_background
+from database.bulk_load import copy_frame, transactional
+from database.aggregates import update_aggregates
+from database.indexes import create_indexes, drop_indexes, secondary_indexes
+from database.partitions import ensure_month_partitions, fact_months, is_partitioned, partition_frames
+from database.load_audit import BLOCK_ROWS, BlockAudit, block_fingerprint, split_blocks
+from dataload.checkpoints import StageCheckpoints, checkpoint_key
+from dataload.flat_tables import flat_tables
+from dataload.dimensions import DIMENSION_PASSES, FACT, extract_dimensions
+from dataload import tables_data
+from dataload.scheduler import Node, run_dag, print_dag_report
+from dataload.key_registry import KeyRegistry
+from dataload.instrumentation import stage
 
-def populate_tables(engine, data_df: pd.DataFrame) -> None:
+# Tables in the order they are inserted, so that every foreign key target already exists
+TABLE_LOAD_ORDER = [
+    ("dim_category", Category),
+    ("dim_product", Product),
+    ("dim_country", Country),
+    ("dim_courier_destination", Destination),
+    ("dim_courier_origin", Origin),
+    ("dim_date", Time),
+    ("dim_courier", Courier),
+    ("dim_delivery_date", Delivery),
+    ("dim_shipment_date", Shipment),
+    ("dim_customer_city", City),
+    ("dim_customer_payment", Payment),
+    ("dim_customer", Customer),
+    ("dim_priority_transport", PriorTransport),
+    ("dim_shipping", Shipping),
+    ("fact_sales_table", Fact),
+    ("star_courier", StarCourier),
+    ("star_customer", StarCustomer),
+    ("star_product", StarProduct),
+    ("star_shipping", StarShipping),
+    ("report_shipments", ReportShipment),
+]
+
+# Tables with a row per fact: appended per shipment rather than deduplicated by key
+FACT_TABLES = ("fact_sales_table", "report_shipments")
+
+# Dimensions with a row per shipment, like the facts: a chunk's members are new, so 
+# their keys are not kept in memory between chunks
+PER_SHIPMENT_TABLES = ("dim_shipping", "star_shipping")
+
+
+def transform_nodes(data_df: pd.DataFrame, registry: KeyRegistry | None = None,
+                    sales_id_start: int = 102, backend: str = "pandas",
+                    builder_rows: dict[str, pd.DataFrame] | None = None) -> dict[str, Node]:
+  """
+  Describes the table builders as a DAG for `run_dag`.
+
+  The dimension builders (one per pass of the dimension plan, see `compile_dimensions`, 
+  and `date_data`) only read the source data and do not depend on each other; only 
+  `fact_data` needs their results (except the date tables, whose keys it computes). Each 
+  node returns its tables keyed by database table name.
+
+  Args:
+      data_df (pd.DataFrame): DataFrame containing the source data.
+      registry (KeyRegistry | None): Registry the surrogate keys are looked up in and
+          allocated from.
+      sales_id_start (int): First `sales_id` handed out to the fact rows.
+      backend (str): DataFrame library the tables are built with (see `get_backend`).
+      builder_rows (dict[str, pd.DataFrame] | None): The distinct rows every dimension 
+          builder reads, already computed (see `read_sources`); the dimensions are then 
+          built from them with the pandas builders instead of scanning the source.
+
+  Returns:
+      dict[str, Node]: The builder nodes keyed by function name.
+  """
+
+  builders = get_backend(backend)
+  source = builders.prepare(data_df)
+
+  def build(builder, table_names):
+      return lambda: dict(zip(table_names, builder(source, registry)))
+
+  def build_dimensions(pass_name):
+      if builder_rows is not None:
+          return lambda: extract_dimensions(builder_rows[pass_name], pass_name, registry, distinct=True)
+      return lambda: builders.dimensions(source, pass_name, registry)
+
+  def build_fact(*pass_tables):
+      dimension_tables = {table_name: df for tables in pass_tables for table_name, df in tables.items()}
+      return {"fact_sales_table": builders.fact_data(source, dimension_tables, sales_id_start)}
+
+  # The fact node waits for the passes extracting the dimensions it references
+  fact_passes = [pass_name for pass_name, dimension_pass in DIMENSION_PASSES.items()
+                 if set(dimension_pass["tables"]) & set(FACT["dimensions"])]
+  nodes: dict[str, Node] = {pass_name: (build_dimensions(pass_name), []) for pass_name in DIMENSION_PASSES}
+  date_tables = ["dim_date", "dim_delivery_date", "dim_shipment_date"]
+  if builder_rows is not None:
+      nodes["date_data"] = (lambda: dict(zip(date_tables, tables_data.date_data(builder_rows["date_data"], registry))), [])
+  else:
+      nodes["date_data"] = (build(builders.date_data, date_tables), [])
+  nodes["fact_data"] = (build_fact, fact_passes)
+  return nodes
+
+
+def build_tables(data_df: pd.DataFrame, registry: KeyRegistry | None = None,
+                 sales_id_start: int = 102, max_workers: int = 1,
+                 on_tables_ready: Callable[[dict[str, pd.DataFrame]], None] | None = None,
+                 report: bool = False, backend: str = "pandas",
+                 checkpoints: StageCheckpoints | None = None, flatten: str | None = None,
+                 builder_rows: dict[str, pd.DataFrame] | None = None) -> dict[str, pd.DataFrame]:
+  """
+  Builds every dimension and fact table from the source DataFrame.
+
+  Args:
+      data_df (pd.DataFrame): DataFrame containing the source data.
+      registry (KeyRegistry | None): Registry the surrogate keys are looked up in and
+          allocated from.
+      sales_id_start (int): First `sales_id` handed out to the fact rows.
+      max_workers (int): Number of builders run at the same time.
+      on_tables_ready (Callable | None): Called on the calling thread with the tables
+          built so far, each time a builder finishes.
+      report (bool): Print per-builder timings and the critical path.
+      backend (str): DataFrame library the tables are built with (see `get_backend`).
+      checkpoints (StageCheckpoints | None): Reload the builders finished by an earlier 
+          attempt from these checkpoints and checkpoint the others as they finish.
+      flatten (str | None): Also build the flattened tables of this mode (see 
+          `flat_tables`) from the snowflake tables.
+      builder_rows (dict[str, pd.DataFrame] | None): The distinct rows of `data_df` every 
+          dimension builder reads, if already computed (see `transform_nodes`).
+
+  Returns:
+      dict[str, pd.DataFrame]: The table data keyed by database table name.
+  """
+
+  nodes = transform_nodes(data_df, registry, sales_id_start, backend, builder_rows)
+  if checkpoints is not None:
+      nodes = checkpoints.wrap(nodes, registry)
+  tables: dict[str, pd.DataFrame] = {}
+
+  def collect(node_name: str, node_tables: dict[str, pd.DataFrame]) -> None:
+      tables.update(node_tables)
+      if on_tables_ready is not None:
+          on_tables_ready(tables)
+
+  _, timings = run_dag(nodes, max_workers, collect)
+  if report:
+      print_dag_report(nodes, timings)
+
+  if flatten is not None:
+      tables.update(flat_tables(tables, flatten))
+  return tables
+
+
+def load_key_registry(connection) -> KeyRegistry:
+  """
+  Reads the surrogate keys of every previously loaded dimension member.
+
+  Args:
+      connection (Connection): SQLAlchemy connection to the database.
+
+  Returns:
+      KeyRegistry: Registry holding the stored keys.
+  """
+
+  registry_df = pd.read_sql(select(KeyRegistryEntry.__table__), connection)
+  return KeyRegistry.from_frame(registry_df)
+
+
+def save_key_registry(connection, registry: KeyRegistry) -> None:
+  """
+  Stores the surrogate keys allocated since the registry was loaded or last saved.
+
+  Args:
+      connection (Connection): SQLAlchemy connection with an open transaction; the
+          caller commits, so the keys are stored together with the rows that use them.
+      registry (KeyRegistry): Registry holding the new keys.
+  """
+
+  copy_frame(connection, KeyRegistryEntry.__table__, registry.pending())
+  registry.mark_saved()
+
+
+def record_load_version(connection) -> int:
+  """
+  Records a new load version, marking results computed from earlier loads as stale.
+
+  Args:
+      connection (Connection): SQLAlchemy connection with an open transaction; the
+          caller commits, so the version becomes visible together with the data.
+
+  Returns:
+      int: The new load version.
+  """
+
+  result = connection.execute(insert(LoadVersion).values(loaded_at=datetime.now(timezone.utc)))
+  return result.inserted_primary_key[0]
+
+
+def load_checkpoints(connection, data_df: pd.DataFrame, sales_id_start: int,
+                     checkpoint_dir: str | None) -> StageCheckpoints | None:
+  """
+  Returns the builder checkpoints of a load, keyed by everything its tables depend on.
+
+  The tables depend on the source rows, the first `sales_id` and the surrogate keys 
+  already stored, which only change when a load is committed; so a retry of a failed 
+  load gets the same key, and any load committed in between invalidates it.
+
+  Args:
+      connection (Connection): SQLAlchemy connection to the database.
+      data_df (pd.DataFrame): Source data of the load.
+      sales_id_start (int): First `sales_id` of the load.
+      checkpoint_dir (str | None): Directory of the checkpoints, or None to not checkpoint.
+
+  Returns:
+      StageCheckpoints | None: The load's checkpoints, or None.
+  """
+
+  if checkpoint_dir is None:
+      return None
+  load_version = connection.execute(select(func.max(LoadVersion.version))).scalar() or 0
+  return StageCheckpoints(checkpoint_key(block_fingerprint(data_df), sales_id_start, load_version), checkpoint_dir)
+
+
+def next_sales_id(connection) -> int:
+  """
+  Returns the first free `sales_id`, so appended facts never reuse an existing ID.
+
+  Args:
+      connection (Connection): SQLAlchemy connection to the database.
+
+  Returns:
+      int: One past the highest loaded `sales_id`, or 102 for an empty fact table.
+  """
+
+  max_sales_id = connection.execute(select(func.max(Fact.sales_id))).scalar()
+  return 102 if max_sales_id is None else max_sales_id + 1
+
+
+def drop_loaded_shipments(connection, fact_df: pd.DataFrame, batch_size: int = 1000, 
+                          model=Fact) -> pd.DataFrame:
+  """
+  Removes the fact rows whose `shipment_id` is already in the fact table.
+
+  Args:
+      connection (Connection): SQLAlchemy connection to the database.
+      fact_df (pd.DataFrame): Fact rows about to be appended.
+      batch_size (int): Number of IDs looked up per query.
+      model (Base): ORM model of the table the rows are appended to (see `FACT_TABLES`).
+
+  Returns:
+      pd.DataFrame: The fact rows of shipments that are not loaded yet.
+  """
+
+  shipment_ids = fact_df["shipment_id"].unique()
+  loaded_ids = []
+  for start in range(0, len(shipment_ids), batch_size):
+      batch = shipment_ids[start:start + batch_size].tolist()
+      loaded_ids.extend(connection.execute(select(model.shipment_id).where(model.shipment_id.in_(batch))).scalars())
+  return fact_df[~fact_df["shipment_id"].isin(loaded_ids)]
+
+
+def drop_loaded_members(tables: dict[str, pd.DataFrame], loaded: dict[str, pd.Index]) -> None:
+  """
+  Removes the dimension members that earlier chunks of the same load already wrote.
+
+  Only the shared dimensions are tracked, whose keys are few. The per-shipment tables 
+  (`PER_SHIPMENT_TABLES`) are left as they are: tracking them would keep a key per fact 
+  in memory. A shipment repeated in a later chunk then fails on its primary key, unless 
+  the load is incremental, which skips existing members and loaded shipments.
+
+  Args:
+      tables (dict[str, pd.DataFrame]): A chunk's tables, filtered in place.
+      loaded (dict[str, pd.Index]): Primary keys written so far per shared dimension, 
+          updated with the chunk's remaining members.
+  """
+
+  for table_name, model in TABLE_LOAD_ORDER:
+      if table_name in FACT_TABLES or table_name in PER_SHIPMENT_TABLES or table_name not in tables:
+          continue
+      pk_col = model.__table__.primary_key.columns.keys()[0]
+      table_df = tables[table_name]
+      if table_name in loaded:
+          tables[table_name] = table_df = table_df[~table_df[pk_col].isin(loaded[table_name])]
+      loaded[table_name] = loaded.get(table_name, pd.Index([])).append(pd.Index(table_df[pk_col]))
+
+
+def insert_ignoring_existing(dialect_name: str, model):
+  """
+  Builds an INSERT that skips rows whose primary key already exists.
+
+  Args:
+      dialect_name (str): Name of the database dialect.
+      model (Base | Table): ORM model or table of the target table.
+
+  Returns:
+      Insert: `INSERT ... ON CONFLICT DO NOTHING` for PostgreSQL or SQLite.
+
+  Raises:
+      ValueError: If the database has no supported equivalent.
+  """
+
+  if dialect_name == "postgresql":
+      return postgresql.insert(model).on_conflict_do_nothing()
+  if dialect_name == "sqlite":
+      return sqlite.insert(model).on_conflict_do_nothing()
+  raise ValueError(f"incremental loads are not supported on {dialect_name}")
+
+
+def insert_tables(session: Session, tables: dict[str, pd.DataFrame], loader: str = "insert",
+                  inserted: set[str] | None = None, incremental: bool = False) -> None:
+  """
+  Inserts table data into the database in foreign-key-safe order.
+
+  Args:
+      session (Session): Open SQLAlchemy session; the caller commits.
+      tables (dict[str, pd.DataFrame]): Table data keyed by database table name; tables 
+          that are not given (e.g. the flattened ones) are not loaded.
+      loader (str): 'insert' for ORM bulk inserts from record dicts, or 'copy' to 
+          stream each frame with `copy_frame` (COPY on PostgreSQL).
+      inserted (set[str] | None): Tables inserted by earlier calls. When given, only the 
+          tables in `tables` whose foreign-key parents are already inserted are loaded, 
+          and their names are added to the set.
+      incremental (bool): Keep what is already loaded: dimension members that already 
+          exist are skipped, and only facts of shipments not loaded yet are appended.
+
+  When the fact table is partitioned by month (see `create_db_table`), the partitions of 
+  new months are created and each month's facts are inserted into its partition.
+  """
+
+  if loader not in ("insert", "copy"):
+      raise ValueError(f"unknown loader '{loader}', expected 'insert' or 'copy'")
+
+  for table_name, model in TABLE_LOAD_ORDER:
+      if inserted is not None:
+          parents = {fk.column.table.name for fk in model.__table__.foreign_keys}
+          if table_name in inserted or table_name not in tables or not parents <= inserted:
+              continue
+          inserted.add(table_name)
+      elif table_name not in tables:
+          continue
+
+      table_df = tables[table_name]
+      is_fact = table_name in FACT_TABLES
+      if incremental and is_fact:
+          table_df = drop_loaded_shipments(session.connection(), table_df, model=model)
+      skip_existing = incremental and not is_fact
+
+      # An empty parameter list would insert a single row of defaults
+      if table_df.empty:
+          continue
+      with stage(f"insert.{table_name}", rows_in=len(table_df)) as metrics:
+          # Facts go straight to their monthly partitions, created first if they are new
+          if table_name == "fact_sales_table" and is_partitioned(session.connection()):
+              ensure_month_partitions(session.connection(), fact_months(table_df).unique())
+              targets = partition_frames(table_df)
+          else:
+              targets = [(model.__table__, table_df)]
+
+          for table, frame in targets:
+              if loader == "copy":
+                  copy_frame(session.connection(), table, frame, skip_existing)
+              elif skip_existing:
+                  session.execute(insert_ignoring_existing(session.bind.dialect.name, table), frame.to_dict(orient='records'))
+              else:
+                  session.execute(insert(table), frame.to_dict(orient='records'))
+          metrics["rows_out"] = len(table_df)
+
+
+def populate_tables(engine, data_df: pd.DataFrame, export_format: str | None = None, 
+                    export_dir: str = "output", export_in_background: bool = False, 
+                    loader: str = "insert", max_workers: int = 1, incremental: bool = False, 
+                    defer_indexes: bool = False, backend: str = "pandas", skip_ingested: bool = False, 
+                    source_path: str = "", block_rows: int = BLOCK_ROWS, 
+                    checkpoint_dir: str | None = None, flatten: str | None = None, 
+                    builder_rows: dict[str, pd.DataFrame] | None = None) -> None:
   """
   Populates database tables with data extracted and transformed from a DataFrame.
 
-  This function takes a SQLAlchemy engine object and a DataFrame containing the 
-  source data. It assumes the DataFrame structure is suitable for generating data 
-  for multiple tables (details depend on the specific implementation). The function 
-  extracts and transforms data from the DataFrame to populate various tables 
+  This function takes a SQLAlchemy engine object and a DataFrame containing the
+  source data. It assumes the DataFrame structure is suitable for generating data
+  for multiple tables (details depend on the specific implementation). The function
+  extracts and transforms data from the DataFrame to populate various tables
   (e.g., Category, Product, Customer, etc.) in the database.
 
   Args:
       engine (Any): SQLAlchemy engine object for the database.
       data_df (pd.DataFrame): DataFrame containing the source data.
+      export_format (str | None): Format the tables are also exported to (see 
+          `export_tables`), or None to skip the export.
+      export_dir (str): Directory the exported files are written to.
+      export_in_background (bool): Write the export while the database load runs.
+      loader (str): 'insert' or 'copy' (see `insert_tables`).
+      max_workers (int): Number of dimension builders run at the same time. Above 1, 
+          per-builder timings and the critical path are printed.
+      incremental (bool): Add to the loaded data instead of expecting empty tables 
+          (see `insert_tables`).
+      defer_indexes (bool): Drop the secondary indexes before inserting and rebuild them 
+          once the load is committed or has failed (concurrently on PostgreSQL).
+      backend (str): 'pandas' or 'polars', the DataFrame library the tables are built with.
+      skip_ingested (bool): Fingerprint the source in blocks of `block_rows` rows and 
+          only load the blocks not recorded in the load audit (see `BlockAudit`). Use 
+          with `incremental`.
+      source_path (str): Path of the source file, recorded in the load audit.
+      block_rows (int): Rows per fingerprinted block.
+      checkpoint_dir (str | None): Save each builder's tables there as Parquet, keyed by 
+          the input and the database state, and reuse those of a failed earlier attempt 
+          at the same load. They are removed once the load is committed.
+      flatten (str | None): Also load the star dimensions ('star'), the wide reporting 
+          table ('wide') or both ('both'), built from the same tables.
+      builder_rows (dict[str, pd.DataFrame] | None): The distinct rows of `data_df` every 
+          dimension builder reads, if already computed (see `merge_builder_rows`).
+
+  Raises:
+      Exception: If an error occurs during the data insertion process.
+  """
+
+  try:
+      export = None
+      indexes = secondary_indexes() if defer_indexes else []
+      audit = BlockAudit(source_path) if skip_ingested else None
+
+      # The indexes are rebuilt even if the load fails, once its transaction is closed
+      try:
+          # Insert every table in one transaction
+          with Session(transactional(engine)) as session:
+              if audit is not None:
+                  # Keep only the blocks of rows not loaded before
+                  blocks = list(split_blocks(data_df, block_rows))
+                  new_blocks = [block_df for block_number, block_df in enumerate(blocks) 
+                                if audit.is_new(session.connection(), block_df, block_number)]
+                  print(f"Skipping {len(blocks) - len(new_blocks)} of {len(blocks)} blocks already loaded")
+                  if not new_blocks:
+                      return
+                  if len(new_blocks) < len(blocks):
+                      # The distinct rows would hold the members of the skipped blocks too
+                      builder_rows = None
+                  data_df = pd.concat(new_blocks)
+
+              drop_indexes(session.connection(), indexes)
+              inserted: set[str] = set()
+              registry = load_key_registry(session.connection())
+
+              # Insert each dimension as soon as it and its parents are built, while the others are still building
+              def insert_dimensions(ready: dict[str, pd.DataFrame]) -> None:
+                  dimensions = {name: table_df for name, table_df in ready.items() if name != "fact_sales_table"}
+                  insert_tables(session, dimensions, loader, inserted, incremental)
+
+              sales_id_start = next_sales_id(session.connection())
+              checkpoints = load_checkpoints(session.connection(), data_df, sales_id_start, checkpoint_dir)
+              tables = build_tables(data_df, registry, sales_id_start, max_workers, insert_dimensions, 
+                                    report=max_workers > 1, backend=backend, checkpoints=checkpoints, 
+                                    flatten=flatten, builder_rows=builder_rows)
+
+              if export_in_background:
+                  export = export_tables_in_background(tables, export_dir, export_format)
+              else:
+                  export_tables(tables, export_dir, export_format)
+
+              insert_tables(session, tables, loader, inserted, incremental)
+              update_aggregates(session.connection(), sales_id_start)
+              save_key_registry(session.connection(), registry)
+              if audit is not None:
+                  audit.record(session.connection())
+              record_load_version(session.connection())
+              session.commit()
+      finally:
+          create_indexes(engine, indexes)
+
+      if checkpoints is not None:
+          checkpoints.clear()
+
+      # Surface export errors before reporting the load as done
+      if export is not None:
+          export.result()
+
+  except Exception as e:
+      raise Exception(f"Error populating tables with data: {e}")
+
+
+def populate_tables_in_chunks(engine, chunks: Iterable[pd.DataFrame | tuple[pd.DataFrame, dict[str, pd.DataFrame]]], 
+                              export_format: str | None = None, 
+                              export_dir: str = "output", export_in_background: bool = False, 
+                              loader: str = "insert", max_workers: int = 1, incremental: bool = False, 
+                              defer_indexes: bool = False, backend: str = "pandas", 
+                              skip_ingested: bool = False, source_path: str = "", 
+                              checkpoint_dir: str | None = None, flatten: str | None = None) -> None:
+  """
+  Populates database tables one chunk of source data at a time.
+
+  Each chunk is transformed on its own, reusing the IDs of dimension members seen in
+  earlier chunks, and only the new dimension members and the chunk's fact rows are
+  inserted before the next chunk is read. Only the keys of the shared dimensions 
+  are kept in memory between chunks (see `drop_loaded_members`), so memory does not 
+  grow with the number of fact rows.
+
+  Args:
+      engine (Any): SQLAlchemy engine object for the database.
+      chunks (Iterable[pd.DataFrame | tuple[pd.DataFrame, dict[str, pd.DataFrame]]]): Chunks 
+          of source data, e.g. from `pd.read_csv(..., chunksize=...)`, or pairs of a chunk 
+          and the distinct rows its dimension builders read (see `read_sources`).
+      export_format (str | None): Partitioned format ('parquet' or 'csv') each chunk's 
+          new rows are also exported to, or None to skip the export.
+      export_dir (str): Directory the exported files are written to.
+      export_in_background (bool): Write each chunk's export while it is being inserted.
+      loader (str): 'insert' or 'copy' (see `insert_tables`).
+      max_workers (int): Number of dimension builders run at the same time.
+      incremental (bool): Add to the loaded data instead of expecting empty tables 
+          (see `insert_tables`).
+      defer_indexes (bool): Drop the secondary indexes before inserting and rebuild them 
+          once the load is committed or has failed (concurrently on PostgreSQL).
+      backend (str): 'pandas' or 'polars', the DataFrame library the tables are built with.
+      skip_ingested (bool): Skip the chunks recorded in the load audit and record the 
+          new ones (see `BlockAudit`). Blocks are the chunks, so a re-run only matches 
+          them when it reads with the same chunk size. Use with `incremental`.
+      source_path (str): Path of the source file, recorded in the load audit.
+      checkpoint_dir (str | None): Checkpoint each chunk's builders there (see 
+          `populate_tables`), so a failed chunk resumes from its finished builders.
+      flatten (str | None): Also load the flattened tables of this mode (see `populate_tables`).
 
   Raises:
       Exception: If an error occurs during the data insertion process.
   """
 
   try:
-      # Extract and transform data for different tables from the source DataFrame
-      courier_df, origin_df, destination_df, country_df = courier_data(data_df)
-      customer_df, payment_df, customer_city_df = customer_data(data_df)
-      product_df, category_df = product_data(data_df)
-      shipping_df, proir_trans_data_df = shipping_data(data_df)
-      date_df, delivery_date_df, shipment_date_df = date_data(data_df)
-      fact_df = fact_data(data_df, courier_df, customer_df, product_df, 
-                          shipping_df, delivery_date_df, shipment_date_df)
-
-
-
-      with Session(engine) as session:
-          # Insert data into tables using SQLAlchemy insert statements and DataFrame conversion
-          session.execute(insert(Category), category_df.to_dict(orient='records'))
-          session.execute(insert(Product), product_df.to_dict(orient='records'))
-          session.execute(insert(Country), country_df.to_dict(orient='records'))
-          session.execute(insert(Destination), destination_df.to_dict(orient='records'))
-          session.execute(insert(Origin), origin_df.to_dict(orient='records'))
-          session.execute(insert(Time), date_df.to_dict(orient='records'))  # Assuming Time table for dates
-          session.execute(insert(Courier), courier_df.to_dict(orient='records'))
-          session.execute(insert(Delivery), delivery_date_df.to_dict(orient='records'))
-          session.execute(insert(Shipment), shipment_date_df.to_dict(orient='records'))
-          session.execute(insert(City), customer_city_df.to_dict(orient='records'))
-          session.execute(insert(Payment), payment_df.to_dict(orient='records'))
-          session.execute(insert(Customer), customer_df.to_dict(orient='records'))
-          session.execute(insert(PriorTransport), proir_trans_data_df.to_dict(orient='records'))
-          session.execute(insert(Shipping), shipping_df.to_dict(orient='records'))
-          session.execute(insert(Fact), fact_df.to_dict(orient='records'))
-          session.commit()
+      loaded: dict[str, pd.Index] = {}
+      export = None
+      indexes = secondary_indexes() if defer_indexes else []
+      audit = BlockAudit(source_path) if skip_ingested else None
+
+      # Each chunk commits, so the dropped indexes are rebuilt even if a later chunk fails
+      try:
+          with Session(transactional(engine)) as session:
+              # Dropped with the first chunk and rebuilt once the chunks are loaded, or one fails
+              drop_indexes(session.connection(), indexes)
+              registry = load_key_registry(session.connection())
+              sales_id_start = next_sales_id(session.connection())
+              for chunk_number, chunk in enumerate(chunks, start=1):
+                  chunk_df, builder_rows = chunk if isinstance(chunk, tuple) else (chunk, None)
+                  if audit is not None and not audit.is_new(session.connection(), chunk_df, chunk_number - 1):
+                      print(f"Chunk {chunk_number}: already loaded, skipped")
+                      continue
+
+                  started = time.perf_counter()
+                  checkpoints = load_checkpoints(session.connection(), chunk_df, sales_id_start, checkpoint_dir)
+                  tables = build_tables(chunk_df, registry, sales_id_start, max_workers, backend=backend, 
+                                        checkpoints=checkpoints, flatten=flatten, builder_rows=builder_rows)
+
+                  # Keep only the dimension members that earlier chunks have not inserted
+                  drop_loaded_members(tables, loaded)
+
+                  # Wait for the previous chunk's export so at most one chunk is held for it
+                  if export is not None:
+                      export.result()
+                  if export_in_background:
+                      export = export_tables_in_background(tables, export_dir, export_format, chunk_number)
+                  else:
+                      export_tables(tables, export_dir, export_format, chunk_number)
+
+                  insert_tables(session, tables, loader, incremental=incremental)
+                  update_aggregates(session.connection(), sales_id_start)
+                  save_key_registry(session.connection(), registry)
+                  if audit is not None:
+                      audit.record(session.connection())
+                  record_load_version(session.connection())
+                  session.commit()
+                  if checkpoints is not None:
+                      checkpoints.clear()
+
+                  sales_id_start += len(chunk_df)
+
+                  elapsed = time.perf_counter() - started
+                  print(f"Chunk {chunk_number}: loaded {len(chunk_df)} rows in {elapsed:.2f}s "
+                        f"({len(chunk_df) / elapsed:.0f} rows/s)")
+
+              if export is not None:
+                  export.result()
+      finally:
+          create_indexes(engine, indexes)
+
+  except Exception as e:
+      raise Exception(f"Error populating tables with data: {e}")
+
+
+def populate_warehouse(chunks: Iterable[pd.DataFrame | tuple[pd.DataFrame, dict[str, pd.DataFrame]]], warehouse_dir: str, max_workers: int = 1, 
+                       backend: str = "pandas", flatten: str | None = None) -> int:
+  """
+  Writes the tables built from the source data as a Parquet warehouse instead of a database.
+
+  The tables are built chunk by chunk like `populate_tables_in_chunks`, with one key 
+  registry kept in memory, and each chunk's rows are written as a new Parquet part of 
+  every table (dimension members already written by earlier chunks are skipped). The 
+  warehouse is rebuilt on every call; query it with `ParquetWarehouse`.
+
+  Args:
+      chunks (Iterable[pd.DataFrame | tuple[pd.DataFrame, dict[str, pd.DataFrame]]]): Source 
+          data, e.g. a single DataFrame in a list or the chunks of `read_source(..., 
+          chunksize=...)`, each optionally paired with the distinct rows its dimension 
+          builders read (see `read_sources`).
+      warehouse_dir (str): Directory with one subdirectory of Parquet files per table.
+      max_workers (int): Number of dimension builders run at the same time.
+      backend (str): 'pandas' or 'polars', the DataFrame library the tables are built with.
+      flatten (str | None): Also write the flattened tables of this mode (see `flat_tables`).
+
+  Returns:
+      int: Number of source rows written.
+
+  Raises:
+      Exception: If an error occurs while building or writing the tables.
+  """
+
+  try:
+      for table_name, _ in TABLE_LOAD_ORDER:
+          if isdir(join(warehouse_dir, table_name)):
+              shutil.rmtree(join(warehouse_dir, table_name))
+
+      registry = KeyRegistry()
+      written: dict[str, pd.Index] = {}
+      sales_id_start = 102
+      for part, chunk in enumerate(chunks):
+          chunk_df, builder_rows = chunk if isinstance(chunk, tuple) else (chunk, None)
+          tables = build_tables(chunk_df, registry, sales_id_start, max_workers, backend=backend, flatten=flatten, 
+                                builder_rows=builder_rows)
+
+          # Keep only the dimension members that earlier chunks have not written
+          drop_loaded_members(tables, written)
+
+          export_tables(tables, warehouse_dir, "parquet", part)
+          sales_id_start += len(chunk_df)
+
+      return sales_id_start - 102
 
   except Exception as e:
-      raise Exception(f"Error populating tables with data: {e}")
\ No newline at end of file
+      raise Exception(f"Error writing the Parquet warehouse: {e}")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import threading
+import time
+from os import makedirs, remove
+from os.path import exists, join
+import pandas as pd
+from sqlalchemy import func, select
+from database.create_table import LoadVersion
+from database.db_query import normalize_sql, query_table
+
+
+class QueryCache:
+    """
+    Disk cache of query results, invalidated whenever a new load is committed.
+
+    Entries are keyed on the normalized SQL and its parameters, stored as Parquet
+    files and tagged with the load version (`load_version` table) they were computed
+    from; an entry from an older load is never returned. The cache keeps at most
+    `max_entries` results, evicting the least recently used, and entries older than
+    `ttl_seconds` expire.
+    """
+
+    def __init__(self, cache_dir: str = join(".cache", "queries"), max_entries: int = 128,
+                 ttl_seconds: float | None = None, version_check_interval: float = 0.0) -> None:
+        """
+        Args:
+            cache_dir (str): Directory holding the Parquet files and the index.
+            max_entries (int): Maximum number of cached results.
+            ttl_seconds (float | None): Age after which an entry expires, or None to keep
+                entries until they are evicted or invalidated.
+            version_check_interval (float): Seconds the last read load version is trusted
+                before it is read again. Above 0, repeated reads within the interval do not
+                touch the database at all.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_interval = version_check_interval
+        self._index_path = join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._version_read_at = 0.0
+
+        makedirs(cache_dir, exist_ok=True)
+        self._index: dict[str, dict] = {}
+        if exists(self._index_path):
+            with open(self._index_path) as index_file:
+                self._index = json.load(index_file)
+
+    @staticmethod
+    def key(query_statement: str, params: dict | None = None) -> str:
+        """Returns the cache key of a statement and its parameters."""
+        payload = json.dumps([normalize_sql(query_statement), params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def current_version(self, connection) -> int:
+        """
+        Returns the load version of the data in the database.
+
+        Args:
+            connection (Connection): SQLAlchemy connection to the database.
+
+        Returns:
+            int: The highest committed load version, or 0 before the first load.
+        """
+        now = time.monotonic()
+        if self._version is None or now - self._version_read_at >= self.version_check_interval:
+            self._version = connection.execute(select(func.max(LoadVersion.version))).scalar() or 0
+            self._version_read_at = now
+        return self._version
+
+    def get(self, key: str, version: int) -> pd.DataFrame | None:
+        """Returns the cached result for the key and load version, or None on a miss."""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+
+            expired = self.ttl_seconds is not None and time.time() - entry["created"] > self.ttl_seconds
+            if entry["version"] != version or expired:
+                self._remove(key)
+                self._save_index()
+                return None
+
+            entry["last_used"] = time.time()
+            self._save_index()
+            return pd.read_parquet(join(self.cache_dir, f"{key}.parquet"))
+
+    def put(self, key: str, version: int, df_result: pd.DataFrame) -> None:
+        """Caches a result computed from the given load version, evicting the least recently used entries."""
+        with self._lock:
+            df_result.to_parquet(join(self.cache_dir, f"{key}.parquet"), index=False)
+            now = time.time()
+            self._index[key] = {"version": version, "created": now, "last_used": now}
+
+            # Drop results of older loads, then the least recently used beyond the limit
+            for stale_key in [k for k, entry in self._index.items() if entry["version"] != version]:
+                self._remove(stale_key)
+            while len(self._index) > self.max_entries:
+                self._remove(min(self._index, key=lambda k: self._index[k]["last_used"]))
+            self._save_index()
+
+    def query(self, query_statement: str, connection, params: dict | None = None) -> pd.DataFrame:
+        """
+        Returns the statement's result from the cache, running it with `query_table` on a miss.
+
+        Args:
+            query_statement (str): SQL query statement to execute.
+            connection (Any): A database connection object.
+            params (dict | None): Values for the statement's bound parameters.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the query result.
+        """
+        key = self.key(query_statement, params)
+        version = self.current_version(connection)
+
+        df_result = self.get(key, version)
+        if df_result is None:
+            df_result = query_table(query_statement, connection, params)
+            self.put(key, version, df_result)
+        return df_result
+
+    def clear(self) -> None:
+        """Removes every cached result."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def _remove(self, key: str) -> None:
+        self._index.pop(key, None)
+        path = join(self.cache_dir, f"{key}.parquet")
+        if exists(path):
+            remove(path)
+
+    def _save_index(self) -> None:
+        with open(self._index_path, "w") as index_file:
+            json.dump(self._index, index_file)
@@ -0,0 +1,116 @@
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any
+import pandas as pd
+from sqlalchemy import text
+from database.duckdb_warehouse import duckdb_query, is_duckdb
+
+logger = logging.getLogger(__name__)
+
+# Set by `configure_query_log`; queries are not measured until it is called
+_config: dict[str, Any] = {"enabled": False, "log_path": None, "slow_ms": 1000.0}
+_write_lock = threading.Lock()
+
+
+def configure_query_log(log_path: str | None = None, slow_ms: float = 1000.0, enabled: bool = True) -> None:
+    """
+    Turns the query log of `query_table` on or off.
+
+    Every statement is logged as JSON on the `database.query_log` logger at INFO level,
+    with its fingerprint, latency, row count and result size; statements slower than
+    `slow_ms` also get their execution plan captured (see `explain`).
+
+    Args:
+        log_path (str | None): File every logged statement is appended to, one JSON
+            object per line.
+        slow_ms (float): Latency in milliseconds above which a statement is slow.
+        enabled (bool): Measure the statements at all.
+    """
+    _config.update(enabled=enabled, log_path=log_path, slow_ms=slow_ms)
+
+
+def query_log_enabled() -> bool:
+    """Tells whether `configure_query_log` turned the query log on."""
+    return _config["enabled"]
+
+
+def explain(connection, query_statement: str, params: dict | None = None) -> str:
+    """
+    Captures how the database runs a statement.
+
+    PostgreSQL runs the statement again under `EXPLAIN (ANALYZE, BUFFERS)`, giving the
+    actual row counts, timings and buffer hits of every plan node (plain `EXPLAIN` for
+    statements other than queries, which must not run twice). SQLite reports its
+    `EXPLAIN QUERY PLAN`, and DuckDB its `EXPLAIN ANALYZE` profile; other databases 
+    their `EXPLAIN`.
+
+    Args:
+        connection (Connection): Connection the statement ran on.
+        query_statement (str): SQL statement, with bound parameters as `:name`.
+        params (dict | None): Values of the bound parameters.
+
+    Returns:
+        str: The plan, one line per plan node.
+    """
+    if is_duckdb(connection):
+        # (explain_key, explain_value) rows, the value being the rendered plan
+        return "\n".join(duckdb_query(connection, f"EXPLAIN ANALYZE {query_statement}", params).iloc[:, -1])
+
+    dialect_name = connection.dialect.name
+    is_query = query_statement.lstrip().lower().startswith(("select", "with"))
+    if dialect_name == "postgresql" and is_query:
+        prefix = "EXPLAIN (ANALYZE, BUFFERS)"
+    elif dialect_name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN"
+    else:
+        prefix = "EXPLAIN"
+
+    rows = connection.execute(text(f"{prefix} {query_statement}"), params or {}).fetchall()
+    if dialect_name == "sqlite":
+        # (id, parent, notused, detail) rows
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+def log_query(connection, query_statement: str, params: dict | None, fingerprint: str,
+              seconds: float, df_result: pd.DataFrame) -> dict[str, Any]:
+    """
+    Logs a statement run by `query_table`, capturing its plan if it was slow.
+
+    A plan that cannot be captured is logged with the error instead; the statement's
+    result is not affected.
+
+    Args:
+        connection (Connection): Connection the statement ran on.
+        query_statement (str): SQL statement that ran.
+        params (dict | None): Values of the bound parameters.
+        fingerprint (str): The statement's `statement_fingerprint`.
+        seconds (float): Time taken to run the statement and fetch its result.
+        df_result (pd.DataFrame): The result.
+
+    Returns:
+        dict[str, Any]: The logged record.
+    """
+    duration_ms = round(seconds * 1000, 3)
+    record: dict[str, Any] = {"event": "query", "fingerprint": fingerprint,
+                              "logged_at": datetime.now(timezone.utc).isoformat(),
+                              "duration_ms": duration_ms, "rows": len(df_result),
+                              "bytes": int(df_result.memory_usage(index=False, deep=True).sum()),
+                              "slow": duration_ms > _config["slow_ms"], "statement": query_statement}
+    if record["slow"]:
+        try:
+            record["plan"] = explain(connection, query_statement, params)
+        except Exception as e:
+            record["plan_error"] = str(e)
+
+    line = json.dumps(record, default=str)
+    if record["slow"]:
+        logger.warning(line)
+    else:
+        logger.info(line)
+    if _config["log_path"] is not None:
+        with _write_lock, open(_config["log_path"], "a") as log_file:
+            log_file.write(line + "\n")
+    return record
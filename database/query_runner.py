@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from sqlalchemy.engine import Engine
+from database.db_query import query_table
+from dataload.instrumentation import stage
+
+
+def _run_query(engine: Engine, name: str, query_statement: str, params: dict | None,
+               query_cache) -> tuple[pd.DataFrame, float]:
+    """Runs one statement on its own pooled connection and returns the result and its duration."""
+    start = time.perf_counter()
+    with stage(f"query.{name}") as metrics, engine.connect() as connection:
+        if query_cache is not None:
+            df_result = query_cache.query(query_statement, connection, params)
+        else:
+            df_result = query_table(query_statement, connection, params)
+        metrics["rows_out"] = len(df_result)
+    return df_result, time.perf_counter() - start
+
+
+def run_queries(engine: Engine, statements: dict[str, str], params: dict[str, dict] | None = None,
+                max_workers: int | None = None, query_cache=None,
+                timings: dict[str, float] | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Runs a batch of independent statements concurrently and returns the results by name.
+
+    Each statement runs on a worker thread with its own connection from the engine's
+    pool, so the batch takes about as long as its slowest statement rather than the
+    sum of all of them. Size the pool (`pool_size` + `max_overflow` in
+    `db_connection`) to at least `max_workers`.
+
+    Args:
+        engine (Engine): SQLAlchemy engine whose pool the connections are taken from.
+        statements (dict[str, str]): SQL statements keyed by name, e.g. `REPORT_QUERIES`.
+        params (dict[str, dict] | None): Bound parameters of the statements that have any,
+            keyed by the same names.
+        max_workers (int | None): Number of statements run at the same time; one per
+            statement when None.
+        query_cache (QueryCache | None): Cache to serve the results from, if any.
+        timings (dict[str, float] | None): If given, filled with each statement's duration
+            in seconds.
+
+    Returns:
+        dict[str, pd.DataFrame]: The results, keyed and ordered like `statements`.
+
+    Raises:
+        Exception: If any statement fails; the message names every failed statement.
+    """
+    params = params or {}
+    if not statements:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(statements)) as executor:
+        futures = {name: executor.submit(_run_query, engine, name, statement, params.get(name), query_cache)
+                   for name, statement in statements.items()}
+
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name], duration = future.result()
+                if timings is not None:
+                    timings[name] = duration
+            except Exception as e:
+                errors[name] = e
+
+    if errors:
+        raise Exception("Error running queries: " + "; ".join(f"{name}: {e}" for name, e in errors.items()))
+    return results
@@ -0,0 +1,27 @@
+# Standard report statements run after every load, keyed by report name
+REPORT_QUERIES = {
+    # Calculating total cost revenue by customer name
+    "revenue_by_segment": """
+        SELECT c.customer_segment, sum(f.total_cost) AS total_revenue
+        FROM fact_sales_table f
+        INNER JOIN dim_customer c ON c.customer_id = f.customer_id
+        GROUP BY c.customer_segment
+        """,
+
+    # Analyzing cost performance by courier name
+    "cost_by_carrier": """
+        SELECT c.carrier_name, sum(f.total_cost) AS total_cost
+        FROM fact_sales_table f
+        INNER JOIN dim_courier c ON f.courier_id = c.courier_id
+        GROUP BY c.carrier_name
+        """,
+
+    # Analyzing quantity of product by shipment date
+    "quantity_by_month_weekday": """
+        SELECT d.month, d.week_day, AVG(f.quantity) AS avg_quantity_shipped
+        FROM fact_sales_table f
+        INNER JOIN dim_shipment_date ds ON ds.shipment_date_id = f.shipment_date_id
+        INNER JOIN dim_date d ON d.date_id = ds.date_id
+        GROUP BY d.month, d.week_day
+        """,
+}
@@ -0,0 +1,84 @@
+from os import makedirs
+from os.path import dirname, exists, join
+import pandas as pd
+
+# Calendar rows generated by earlier runs; extended whenever a run needs dates outside it
+CALENDAR_CACHE = join(".cache", "dim_date.pkl")
+
+_calendar_df: pd.DataFrame | None = None
+
+
+def date_key(dates: pd.Series) -> pd.Series:
+    """
+    Computes the `yyyymmdd` integer key of each date.
+
+    Args:
+        dates (pd.Series): Datetime values.
+
+    Returns:
+        pd.Series: Integer keys, e.g. 20230505 for 5 May 2023.
+    """
+    return dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+
+
+def generate_calendar(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Generates one `dim_date` row per day from `start` to `end`, inclusive.
+
+    Args:
+        start (pd.Timestamp): First day.
+        end (pd.Timestamp): Last day.
+
+    Returns:
+        pd.DataFrame: Calendar rows keyed by their `yyyymmdd` `date_id`.
+    """
+    # initializing empty data drame to store date data
+    date_df = pd.DataFrame()
+
+    # creating date data variables and inserting into dataframe
+    date_df['date'] = pd.date_range(start=start, end=end, freq="D")
+    date_df['month'] = date_df['date'].dt.month
+    date_df['year'] = date_df['date'].dt.year
+    date_df['quarter'] = date_df['date'].dt.quarter
+    date_df['day'] = date_df['date'].dt.day
+    date_df['week_day'] = date_df['date'].dt.strftime('%A')
+    date_df['date_id'] = date_key(date_df['date'])
+    return date_df
+
+
+def calendar_dimension(start: pd.Timestamp, end: pd.Timestamp, cache_path: str | None = CALENDAR_CACHE) -> pd.DataFrame:
+    """
+    Returns the `dim_date` rows from `start` to `end`, reusing the cached calendar.
+
+    The calendar is generated in whole years and kept in memory and in `cache_path`,
+    so it is only regenerated when a run needs dates outside the cached years.
+
+    Args:
+        start (pd.Timestamp): First day needed.
+        end (pd.Timestamp): Last day needed.
+        cache_path (str | None): Pickle file the calendar is cached in, or None to
+            cache in memory only.
+
+    Returns:
+        pd.DataFrame: Calendar rows keyed by their `yyyymmdd` `date_id`.
+    """
+    global _calendar_df
+
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if _calendar_df is None and cache_path is not None and exists(cache_path):
+        _calendar_df = pd.read_pickle(cache_path)
+
+    cached = _calendar_df
+    if cached is None or cached.empty or cached['date'].iloc[0] > start or cached['date'].iloc[-1] < end:
+        # Regenerate whole years covering both the cached and the requested range
+        first = start if cached is None or cached.empty else min(start, cached['date'].iloc[0])
+        last = end if cached is None or cached.empty else max(end, cached['date'].iloc[-1])
+        cached = generate_calendar(pd.Timestamp(first.year, 1, 1), pd.Timestamp(last.year, 12, 31))
+        _calendar_df = cached
+
+        if cache_path is not None:
+            makedirs(dirname(cache_path) or ".", exist_ok=True)
+            cached.to_pickle(cache_path)
+
+    in_range = (cached['date'] >= start) & (cached['date'] <= end)
+    return cached[in_range].reset_index(drop=True)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import shutil
+from os import listdir, makedirs
+from os.path import exists, isdir, join
+from typing import Any, Callable
+import pandas as pd
+from dataload.key_registry import KeyRegistry
+from dataload.scheduler import Node
+
+# Directory the stage checkpoints are written under, one subdirectory per input
+CHECKPOINT_DIR = join(".cache", "checkpoints")
+
+# Written last in a stage's directory, so a stage interrupted while saving is not reused
+_DONE_MARKER = "_DONE"
+_REGISTRY_FILE = "_registry.parquet"
+
+
+def checkpoint_key(*parts: Any) -> str:
+    """
+    Derives the checkpoint key of a run from everything its results depend on.
+
+    Args:
+        *parts (Any): E.g. the source fingerprint, the first `sales_id` and the load
+            version the keys were allocated against.
+
+    Returns:
+        str: The hex digest identifying the run's checkpoints.
+    """
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class StageCheckpoints:
+    """
+    Parquet checkpoints of the table builders' results, for resuming a failed run.
+
+    Each finished stage (DAG node) saves its tables to `<checkpoint_dir>/<key>/<stage>/`
+    together with the keys the registry had allocated by then. A run with the same key
+    reloads the finished stages (memory-mapped) instead of rebuilding them, and only
+    runs the stages that did not finish.
+    """
+
+    def __init__(self, key: str, checkpoint_dir: str = CHECKPOINT_DIR) -> None:
+        """
+        Args:
+            key (str): Identifies the run's input, see `checkpoint_key`.
+            checkpoint_dir (str): Directory the checkpoints of every key are kept in.
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.run_dir = join(checkpoint_dir, key)
+
+    def _stage_dir(self, stage: str) -> str:
+        return join(self.run_dir, stage)
+
+    def finished(self, stage: str) -> bool:
+        """Tells whether the stage's results were saved completely."""
+        return exists(join(self._stage_dir(stage), _DONE_MARKER))
+
+    def save(self, stage: str, tables: dict[str, pd.DataFrame], registry: KeyRegistry | None = None) -> None:
+        """
+        Saves a stage's tables, and the keys allocated so far, as Parquet files.
+
+        Args:
+            stage (str): Name of the stage.
+            tables (dict[str, pd.DataFrame]): The stage's tables keyed by table name.
+            registry (KeyRegistry | None): Registry whose pending keys are saved with the stage.
+        """
+        stage_dir = self._stage_dir(stage)
+        makedirs(stage_dir, exist_ok=True)
+        for table_name, table_df in tables.items():
+            table_df.to_parquet(join(stage_dir, f"{table_name}.parquet"), index=False)
+        if registry is not None:
+            registry.pending().to_parquet(join(stage_dir, _REGISTRY_FILE), index=False)
+        open(join(stage_dir, _DONE_MARKER), "w").close()
+
+    def load(self, stage: str, registry: KeyRegistry | None = None) -> dict[str, pd.DataFrame]:
+        """
+        Reloads a finished stage's tables, memory-mapping the Parquet files.
+
+        Args:
+            stage (str): Name of the stage.
+            registry (KeyRegistry | None): Registry the stage's saved keys are restored into,
+                so they are stored with the load like keys allocated in this run.
+
+        Returns:
+            dict[str, pd.DataFrame]: The stage's tables keyed by table name.
+        """
+        stage_dir = self._stage_dir(stage)
+        tables = {file_name[:-len(".parquet")]: pd.read_parquet(join(stage_dir, file_name), memory_map=True)
+                  for file_name in sorted(listdir(stage_dir))
+                  if file_name.endswith(".parquet") and file_name != _REGISTRY_FILE}
+        if registry is not None and exists(join(stage_dir, _REGISTRY_FILE)):
+            registry.restore(pd.read_parquet(join(stage_dir, _REGISTRY_FILE)))
+        return tables
+
+    def wrap(self, nodes: dict[str, Node], registry: KeyRegistry | None = None) -> dict[str, Node]:
+        """
+        Makes DAG nodes reload finished stages and checkpoint the others when they finish.
+
+        Args:
+            nodes (dict[str, Node]): Nodes returning their tables keyed by table name.
+            registry (KeyRegistry | None): Registry the nodes allocate keys from.
+
+        Returns:
+            dict[str, Node]: The wrapped nodes, with the same names and parents.
+        """
+        def restored(stage: str) -> Callable[..., dict[str, pd.DataFrame]]:
+            return lambda *parents: self.load(stage, registry)
+
+        def checkpointed(stage: str, func: Callable[..., dict[str, pd.DataFrame]]) -> Callable[..., dict[str, pd.DataFrame]]:
+            def run(*parents):
+                tables = func(*parents)
+                self.save(stage, tables, registry)
+                return tables
+            return run
+
+        return {stage: (restored(stage) if self.finished(stage) else checkpointed(stage, func), parents)
+                for stage, (func, parents) in nodes.items()}
+
+    def clear(self) -> None:
+        """Removes the run's checkpoints, e.g. once its load is committed."""
+        if isdir(self.run_dir):
+            shutil.rmtree(self.run_dir)
@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+from dataload.instrumentation import stage
+from dataload.key_registry import KeyRegistry
+
+# The dimension tables drawn from the source, keyed by database table name:
+# `key` is the natural key (named as in the table), `id` the surrogate key allocated
+# from the key registry (None when the natural key is the primary key), `attributes`
+# the further source columns kept, taken from each member's first occurrence, and
+# `parents` the source columns holding the natural key of every parent dimension
+# referenced by a foreign key. A dimension with `sources` draws its members from
+# several groups of source columns, one per role, e.g. the countries of both ends of
+# a route. The table columns are the key, the attributes, the surrogate key and the
+# parents' surrogate keys, in that order.
+DIMENSIONS = {
+    "dim_product": {"key": ["product_name"], "id": "product_id", "attributes": ["unit_price"],
+                    "parents": {"dim_category": ["category"]}},
+    "dim_category": {"key": ["category"], "id": "category_id"},
+    "dim_customer": {"key": ["customer_name"], "id": "customer_id", "attributes": ["customer_segment"],
+                     "parents": {"dim_customer_payment": ["payment_method"],
+                                 "dim_customer_city": ["customer_city"]}},
+    "dim_customer_payment": {"key": ["payment_method"], "id": "payment_id"},
+    "dim_customer_city": {"key": ["customer_city"], "id": "city_id",
+                          "attributes": ["customer_state", "customer_country"]},
+    "dim_courier": {"key": ["carrier_name"], "id": "courier_id", "attributes": ["carrier_rating"],
+                    "parents": {"dim_courier_origin": ["origin_city"],
+                                "dim_courier_destination": ["destination_city"]}},
+    "dim_courier_origin": {"key": ["origin_city"], "id": "origin_id", "attributes": ["origin_state"],
+                           "parents": {"dim_country": ["origin_country"]}},
+    "dim_courier_destination": {"key": ["destination_city"], "id": "destination_id",
+                                "attributes": ["destination_state"],
+                                "parents": {"dim_country": ["destination_country"]}},
+    "dim_country": {"key": ["country"], "id": "country_id",
+                    "sources": [["destination_country"], ["origin_country"]]},
+    "dim_shipping": {"key": ["shipment_id"], "id": None,
+                     "parents": {"dim_priority_transport": ["mode_of_transport", "shipping_priority"]}},
+    "dim_priority_transport": {"key": ["mode_of_transport", "shipping_priority"], "id": "prior_trans_id"},
+}
+
+
+# The fact table: the source columns it keeps as they are, and the dimensions every
+# fact references, by their surrogate key (or by their natural key when they have none,
+# which must then be among the measures)
+FACT = {
+    "measures": ["shipment_id", "total_cost", "quantity"],
+    "dimensions": ["dim_courier", "dim_customer", "dim_product", "dim_shipping"],
+}
+
+
+def fact_references(fact: dict = FACT, dimensions: dict[str, dict] = DIMENSIONS) -> list[tuple[str, list[str], str | None]]:
+    """
+    Lists the foreign keys of the fact table.
+
+    Args:
+        fact (dict): Declaration as in `FACT`.
+        dimensions (dict[str, dict]): Declarations as in `DIMENSIONS`.
+
+    Returns:
+        list[tuple[str, list[str], str | None]]: The table name, natural key and surrogate
+            key (None when the natural key is itself a measure) of every referenced dimension.
+    """
+    return [(table_name, dimensions[table_name]["key"], dimensions[table_name]["id"])
+            for table_name in fact["dimensions"]]
+
+
+def _parents(dimension: dict) -> dict[str, list[str]]:
+    return dimension.get("parents", {})
+
+
+def _source_columns(dimension: dict) -> list[str]:
+    """Source columns a dimension reads, in declaration order."""
+    groups = dimension.get("sources", [dimension["key"] + dimension.get("attributes", [])])
+    columns = [column for group in groups for column in group]
+    columns += [column for parent_columns in _parents(dimension).values() for column in parent_columns]
+    return list(dict.fromkeys(columns))
+
+
+def compile_dimensions(dimensions: dict[str, dict] = DIMENSIONS) -> dict[str, dict]:
+    """
+    Compiles the dimension declarations into passes over the source data.
+
+    Dimensions linked by foreign keys are extracted together, in one pass over the
+    distinct rows of all the source columns they read (see `extract_dimensions`). A
+    pass is named after its first table that no other dimension references, e.g.
+    `dim_product` and `dim_category` are extracted by `product_data`.
+
+    Args:
+        dimensions (dict[str, dict]): Declarations as in `DIMENSIONS`.
+
+    Returns:
+        dict[str, dict]: The passes keyed by name, each with the source `columns` it
+            reads, its `tables` in declaration order and its `build_order`, parents
+            before the dimensions referencing them.
+
+    Raises:
+        ValueError: If a declaration is invalid or the foreign keys form a cycle.
+    """
+    # Group the dimensions linked by foreign keys (union-find)
+    family = {table_name: table_name for table_name in dimensions}
+
+    def find(table_name: str) -> str:
+        while family[table_name] != table_name:
+            table_name = family[table_name]
+        return table_name
+
+    for table_name, dimension in dimensions.items():
+        groups = dimension.get("sources", [dimension["key"]])
+        if any(len(group) != len(dimension["key"]) for group in groups):
+            raise ValueError(f"{table_name}: every source group must have one column per key column")
+        if "sources" in dimension and (dimension.get("attributes") or _parents(dimension)):
+            raise ValueError(f"{table_name}: a dimension drawn from several sources cannot have attributes or parents")
+        for parent, columns in _parents(dimension).items():
+            if parent not in dimensions:
+                raise ValueError(f"{table_name}: parent {parent} is not declared")
+            if dimensions[parent]["id"] is None:
+                raise ValueError(f"{table_name}: parent {parent} has no surrogate key to reference")
+            if len(columns) != len(dimensions[parent]["key"]):
+                raise ValueError(f"{table_name}: the reference to {parent} must name one column per key column")
+            family[find(table_name)] = find(parent)
+
+    # Order every family's dimensions so parents are built first
+    build_order: list[str] = []
+    visiting: set[str] = set()
+
+    def visit(table_name: str) -> None:
+        if table_name in build_order:
+            return
+        if table_name in visiting:
+            raise ValueError(f"{table_name}: the foreign keys form a cycle")
+        visiting.add(table_name)
+        for parent in _parents(dimensions[table_name]):
+            visit(parent)
+        build_order.append(table_name)
+
+    for table_name in dimensions:
+        visit(table_name)
+
+    referenced = {parent for dimension in dimensions.values() for parent in _parents(dimension)}
+    passes: dict[str, dict] = {}
+    families: dict[str, dict] = {}
+    for table_name, dimension in dimensions.items():
+        root = find(table_name)
+        if root not in families:
+            families[root] = {"columns": [], "tables": [], "build_order": [], "name": None}
+        dimension_pass = families[root]
+        dimension_pass["tables"].append(table_name)
+        dimension_pass["columns"] = list(dict.fromkeys(dimension_pass["columns"] + _source_columns(dimension)))
+        if dimension_pass["name"] is None and table_name not in referenced:
+            dimension_pass["name"] = f"{table_name.removeprefix('dim_')}_data"
+
+    for dimension_pass in families.values():
+        dimension_pass["build_order"] = [table_name for table_name in build_order
+                                         if table_name in dimension_pass["tables"]]
+        passes[dimension_pass.pop("name")] = dimension_pass
+    return passes
+
+
+# The passes of the declared dimensions, compiled once
+DIMENSION_PASSES = compile_dimensions(DIMENSIONS)
+
+
+def key_index(keys: pd.Series) -> pd.Index:
+    """
+    Builds the hash index of a dimension's natural keys.
+
+    Args:
+        keys (pd.Series): The dimension's natural key column.
+
+    Returns:
+        pd.Index: The keys, categoricals as plain values.
+
+    Raises:
+        ValueError: If a key occurs more than once, so rows could not be resolved to one member.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.astype(keys.cat.categories.dtype)
+    index = pd.Index(keys)
+    if not index.is_unique:
+        raise ValueError(f"natural key '{keys.name}' is not unique in its dimension")
+    return index
+
+
+def lookup_positions(index: pd.Index, values: pd.Series) -> np.ndarray:
+    """
+    Finds the position of every value in a dimension's key index in one vectorized pass.
+
+    Categorical values are looked up once per category and mapped through their codes,
+    so the per-row work is a single array take.
+
+    Args:
+        index (pd.Index): Natural keys from `key_index`.
+        values (pd.Series): The natural key of every row.
+
+    Returns:
+        np.ndarray: Position of each row's key in `index`, or -1 where it is missing.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return index.get_indexer(values)
+
+    # One extra slot for code -1 (missing values), which looks up a missing key
+    category_positions = np.append(index.get_indexer(values.cat.categories), index.get_indexer([np.nan]))
+    return category_positions[values.cat.codes.to_numpy()]
+
+
+def key_positions(keys: pd.DataFrame, values: pd.DataFrame) -> np.ndarray:
+    """
+    Finds every row of `values` in a dimension's natural keys, matching the columns by position.
+
+    Args:
+        keys (pd.DataFrame): The dimension's natural key columns.
+        values (pd.DataFrame): The natural key columns of every row.
+
+    Returns:
+        np.ndarray: Position of each row's key in `keys`, or -1 where it is missing.
+
+    Raises:
+        ValueError: If a key occurs more than once in `keys`.
+    """
+    if len(keys.columns) == 1:
+        return lookup_positions(key_index(keys.iloc[:, 0]), values.iloc[:, 0])
+    index = pd.MultiIndex.from_frame(keys)
+    if not index.is_unique:
+        raise ValueError(f"natural key {list(keys.columns)} is not unique in its dimension")
+    return index.get_indexer(pd.MultiIndex.from_frame(values))
+
+
+def extract_dimensions(df_data: pd.DataFrame, pass_name: str, registry: KeyRegistry | None = None,
+                       passes: dict[str, dict] = DIMENSION_PASSES,
+                       dimensions: dict[str, dict] = DIMENSIONS, distinct: bool = False) -> dict[str, pd.DataFrame]:
+    """
+    Builds the dimension tables of one pass of the compiled plan.
+
+    The source is scanned once, for the distinct rows of the pass's columns in
+    first-occurrence order; every dimension is then drawn from those rows. As they
+    hold every member's first occurrence, in source order, the members, their
+    attributes and the order their keys are allocated in are those of the full source.
+    Parent keys are resolved with one hash lookup per foreign key.
+
+    Args:
+        df_data (pd.DataFrame): Source data, or any rows holding its distinct rows of
+            the pass's columns in first-occurrence order.
+        pass_name (str): Name of the pass in `passes`.
+        registry (KeyRegistry | None): Registry the surrogate keys are looked up in and
+            allocated from. A fresh registry, numbering from 1, is used when None.
+        passes (dict[str, dict]): The plan from `compile_dimensions`.
+        dimensions (dict[str, dict]): The declarations the plan was compiled from.
+        distinct (bool): `df_data` holds exactly the distinct rows of the pass's columns,
+            e.g. computed by another library, so the scan is skipped.
+
+    Returns:
+        dict[str, pd.DataFrame]: The pass's tables keyed by database table name.
+
+    Raises:
+        Exception: If an error occurs during data processing.
+    """
+    dimension_pass = passes[pass_name]
+    registry = registry if registry is not None else KeyRegistry()
+
+    with stage(pass_name, len(df_data)) as metrics:
+        try:
+            rows = df_data[dimension_pass["columns"]]
+            unique_rows = rows if distinct else rows.drop_duplicates(ignore_index=True)
+
+            tables: dict[str, pd.DataFrame] = {}
+            for table_name in dimension_pass["build_order"]:
+                dimension = dimensions[table_name]
+                key, id_col = dimension["key"], dimension["id"]
+                attributes = dimension.get("attributes", [])
+
+                if "sources" in dimension:
+                    members = pd.concat([unique_rows[group].set_axis(key, axis=1) for group in dimension["sources"]],
+                                        ignore_index=True)
+                else:
+                    members = unique_rows[_source_columns(dimension)]
+                members = members.drop_duplicates(subset=key, ignore_index=True)
+
+                if id_col is not None:
+                    members = registry.assign(id_col, members, key, id_col)
+
+                parent_ids = []
+                for parent, columns in _parents(dimension).items():
+                    parent_df, parent_dimension = tables[parent], dimensions[parent]
+                    positions = key_positions(parent_df[parent_dimension["key"]], members[columns])
+                    if (positions < 0).any():
+                        raise ValueError(f"{table_name} references members missing from {parent}")
+                    members[parent_dimension["id"]] = parent_df[parent_dimension["id"]].to_numpy()[positions]
+                    parent_ids.append(parent_dimension["id"])
+
+                tables[table_name] = members[key + attributes + ([id_col] if id_col else []) + parent_ids]
+
+            metrics["rows_out"] = sum(len(table) for table in tables.values())
+            return {table_name: tables[table_name] for table_name in dimension_pass["tables"]}
+
+        except Exception as e:
+            raise Exception(f"Error extracting the dimensions of {pass_name}: {e}")
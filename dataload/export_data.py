@@ -0,0 +1,94 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import makedirs
+from os.path import join
+import pandas as pd
+from dataload.instrumentation import instrumented
+
+# Formats accepted by `export_tables`
+EXPORT_FORMATS = ("excel", "parquet", "csv")
+
+
+def _write_excel(tables: dict[str, pd.DataFrame], output_dir: str, part: int | None, rows_per_file: int) -> None:
+    """Writes every table as a sheet of a single workbook in one pass."""
+    if part is not None:
+        raise ValueError("Excel export cannot be written in parts; use 'parquet' or 'csv' for chunked loads")
+
+    with pd.ExcelWriter(join(output_dir, "output.xlsx")) as writer:
+        for table_name, table_df in tables.items():
+            table_df.to_excel(writer, sheet_name=table_name, index=False)
+
+
+def _write_partitioned(tables: dict[str, pd.DataFrame], output_dir: str, part: int | None,
+                       rows_per_file: int, extension: str) -> None:
+    """Writes every table to its own directory, split into files of at most `rows_per_file` rows."""
+    prefix = "part" if part is None else f"part-{part:05d}"
+    for table_name, table_df in tables.items():
+        table_dir = join(output_dir, table_name)
+        makedirs(table_dir, exist_ok=True)
+
+        for file_number, start in enumerate(range(0, max(len(table_df), 1), rows_per_file)):
+            file_df = table_df.iloc[start:start + rows_per_file]
+            file_path = join(table_dir, f"{prefix}-{file_number:03d}.{extension}")
+            if extension == "parquet":
+                file_df.to_parquet(file_path, index=False)
+            else:
+                file_df.to_csv(file_path, index=False)
+
+
+@instrumented("export")
+def export_tables(tables: dict[str, pd.DataFrame], output_dir: str = "output", export_format: str | None = "excel",
+                  part: int | None = None, rows_per_file: int = 1_000_000) -> None:
+    """
+    Writes the dimension and fact tables to files in a single pass.
+
+    'excel' writes one workbook with a sheet per table, which suits small runs.
+    'parquet' and 'csv' write one directory per table with the rows split across
+    files, which suits large runs and chunked loads.
+
+    Args:
+        tables (dict[str, pd.DataFrame]): Table data keyed by database table name.
+        output_dir (str): Directory the files are written to.
+        export_format (str | None): One of `EXPORT_FORMATS`, or None to skip the export.
+        part (int | None): Chunk number, used to name the files of chunked loads.
+        rows_per_file (int): Maximum rows per file for the partitioned formats.
+
+    Raises:
+        Exception: If the format is unknown or an error occurs while writing.
+    """
+    if export_format is None:
+        return
+
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format '{export_format}', expected one of {EXPORT_FORMATS}")
+
+        makedirs(output_dir, exist_ok=True)
+        if export_format == "excel":
+            _write_excel(tables, output_dir, part, rows_per_file)
+        else:
+            _write_partitioned(tables, output_dir, part, rows_per_file, export_format)
+
+    except Exception as e:
+        raise Exception(f"Error exporting tables: {e}")
+
+
+def export_tables_in_background(tables: dict[str, pd.DataFrame], output_dir: str = "output",
+                                export_format: str | None = "excel", part: int | None = None,
+                                rows_per_file: int = 1_000_000) -> Future:
+    """
+    Runs `export_tables` on a background thread.
+
+    Args:
+        tables (dict[str, pd.DataFrame]): Table data keyed by database table name.
+        output_dir (str): Directory the files are written to.
+        export_format (str | None): One of `EXPORT_FORMATS`, or None to skip the export.
+        part (int | None): Chunk number, used to name the files of chunked loads.
+        rows_per_file (int): Maximum rows per file for the partitioned formats.
+
+    Returns:
+        Future: Resolves once the files are written; `result()` re-raises export errors.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(export_tables, dict(tables), output_dir, export_format, part, rows_per_file)
+    executor.shutdown(wait=False)
+    return future
@@ -0,0 +1,89 @@
+import pandas as pd
+from dataload.instrumentation import instrumented
+
+# What a load can flatten the snowflake into: the star dimensions, the wide reporting
+# table, or both
+FLATTEN_MODES = ("star", "wide", "both")
+
+
+def _lookup(df: pd.DataFrame, lookup_df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Adds the columns of a parent table to the rows referencing it, keeping their order."""
+    return df.merge(lookup_df, on=key, how="left", validate="many_to_one").drop(columns=key)
+
+
+def star_dimensions(tables: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Collapses every snowflaked dimension into one table with all of its attributes.
+
+    Args:
+        tables (dict[str, pd.DataFrame]): The tables built by `build_tables`.
+
+    Returns:
+        dict[str, pd.DataFrame]: `star_courier`, `star_customer`, `star_product` and
+            `star_shipping`, keyed by the same surrogate keys as the snowflake.
+    """
+    country_df = tables["dim_country"]
+    origin_df = _lookup(tables["dim_courier_origin"], country_df.rename(columns={"country": "origin_country"}),
+                        "country_id")
+    destination_df = _lookup(tables["dim_courier_destination"],
+                             country_df.rename(columns={"country": "destination_country"}), "country_id")
+    courier_df = _lookup(_lookup(tables["dim_courier"], origin_df, "origin_id"), destination_df, "destination_id")
+
+    customer_df = _lookup(_lookup(tables["dim_customer"], tables["dim_customer_payment"], "payment_id"),
+                          tables["dim_customer_city"], "city_id")
+    product_df = _lookup(tables["dim_product"], tables["dim_category"], "category_id")
+    shipping_df = _lookup(tables["dim_shipping"], tables["dim_priority_transport"], "prior_trans_id")
+    return {"star_courier": courier_df, "star_customer": customer_df,
+            "star_product": product_df, "star_shipping": shipping_df}
+
+
+def wide_table(tables: dict[str, pd.DataFrame], star: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Joins every fact row with all of its dimension attributes.
+
+    Args:
+        tables (dict[str, pd.DataFrame]): The tables built by `build_tables`.
+        star (dict[str, pd.DataFrame]): The tables from `star_dimensions`.
+
+    Returns:
+        pd.DataFrame: The `report_shipments` rows, one per fact.
+    """
+    date_df = tables["dim_date"][["date_id", "date", "year", "month", "week_day"]]
+    shipment_dates = date_df.rename(columns={"date_id": "shipment_date_id", "date": "shipment_date",
+                                             "year": "shipment_year", "month": "shipment_month",
+                                             "week_day": "shipment_week_day"})
+    delivery_dates = date_df[["date_id", "date"]].rename(columns={"date_id": "delivery_date_id",
+                                                                  "date": "delivery_date"})
+
+    wide_df = tables["fact_sales_table"]
+    wide_df = wide_df.merge(shipment_dates, on="shipment_date_id", how="left", validate="many_to_one")
+    wide_df = wide_df.merge(delivery_dates, on="delivery_date_id", how="left", validate="many_to_one")
+    wide_df = _lookup(wide_df, star["star_courier"], "courier_id")
+    wide_df = _lookup(wide_df, star["star_customer"], "customer_id")
+    wide_df = _lookup(wide_df, star["star_product"], "product_id")
+    return wide_df.merge(star["star_shipping"], on="shipment_id", how="left", validate="many_to_one")
+
+
+@instrumented()
+def flat_tables(tables: dict[str, pd.DataFrame], flatten: str) -> dict[str, pd.DataFrame]:
+    """
+    Builds the flattened tables of a load from its snowflake tables.
+
+    Args:
+        tables (dict[str, pd.DataFrame]): The tables built by `build_tables`.
+        flatten (str): One of `FLATTEN_MODES`.
+
+    Returns:
+        dict[str, pd.DataFrame]: The flattened tables keyed by database table name.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if flatten not in FLATTEN_MODES:
+        raise ValueError(f"unknown flatten mode '{flatten}', expected one of {FLATTEN_MODES}")
+
+    star = star_dimensions(tables)
+    flat = dict(star) if flatten in ("star", "both") else {}
+    if flatten in ("wide", "both"):
+        flat["report_shipments"] = wide_table(tables, star)
+    return flat
@@ -0,0 +1,190 @@
+import cProfile
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from os import makedirs
+from os.path import join
+from typing import Any, Callable, Iterable, Iterator
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Set by `configure_metrics`; by default stages are only logged
+_config: dict[str, Any] = {"metrics_path": None, "trace_memory": False, "profile_stage": None, "profile_dir": "."}
+_write_lock = threading.Lock()
+_profiles: dict[str, cProfile.Profile] = {}
+
+
+def configure_metrics(metrics_path: str | None = None, trace_memory: bool = False,
+                      profile_stage: str | None = None, profile_dir: str = ".") -> None:
+    """
+    Configures what every pipeline stage records and where it goes.
+
+    Stage metrics are always logged as JSON on the `dataload.instrumentation` logger
+    at INFO level; this adds a metrics file, Python allocation tracking and profiling.
+
+    Args:
+        metrics_path (str | None): File each stage's metrics are appended to, one JSON
+            object per line.
+        trace_memory (bool): Track Python allocations with `tracemalloc` and record each
+            stage's net and peak allocation. This slows the pipeline down noticeably.
+        profile_stage (str | None): Name of a stage to run under cProfile, e.g.
+            'fact_data' or 'insert.fact_sales_table'; the stats are written to
+            `<profile_dir>/<stage>.prof`, accumulated over every run of the stage.
+        profile_dir (str): Directory the profile is written to.
+    """
+    _config.update(metrics_path=metrics_path, trace_memory=trace_memory, profile_stage=profile_stage,
+                   profile_dir=profile_dir)
+    _profiles.clear()
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def count_rows(value: Any) -> int | None:
+    """
+    Returns the number of rows of a DataFrame, or the total over a tuple/list/dict of them.
+
+    A tuple starting with a DataFrame, such as a source chunk paired with its distinct
+    builder rows, counts the rows of that DataFrame.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)) and value and all(isinstance(item, pd.DataFrame) for item in value):
+        return sum(len(item) for item in value)
+    if isinstance(value, tuple) and value and isinstance(value[0], pd.DataFrame):
+        return len(value[0])
+    return None
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return round(max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 2 ** 10, 1)
+
+
+def _emit(metrics: dict[str, Any]) -> None:
+    line = json.dumps(metrics, default=str)
+    logger.info(line)
+    if _config["metrics_path"] is not None:
+        with _write_lock, open(_config["metrics_path"], "a") as metrics_file:
+            metrics_file.write(line + "\n")
+
+
+@contextmanager
+def stage(name: str, rows_in: int | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Measures a pipeline stage and emits its metrics when it ends.
+
+    Records the wall time, the CPU time of the calling thread, the process's peak RSS
+    so far and, when memory tracing is on, the net and peak Python allocation during
+    the stage. Set `rows_out` on the yielded dict to record the rows produced. A
+    failing stage is emitted with its error before the exception propagates.
+
+    Stages that overlap (e.g. builders run with `max_workers > 1`) share the process's
+    allocations, so their memory figures include each other's.
+
+    Args:
+        name (str): Name of the stage.
+        rows_in (int | None): Number of rows the stage consumes.
+
+    Yields:
+        dict[str, Any]: The stage's metrics, completed when the stage ends.
+    """
+    metrics: dict[str, Any] = {"stage": name, "started_at": datetime.now(timezone.utc).isoformat(),
+                               "thread": threading.current_thread().name, "rows_in": rows_in, "rows_out": None}
+    trace_memory = _config["trace_memory"] and tracemalloc.is_tracing()
+    if trace_memory:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    profiler = None
+    if name == _config["profile_stage"]:
+        profiler = _profiles.setdefault(name, cProfile.Profile())
+        profiler.enable()
+
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        yield metrics
+        metrics.setdefault("status", "ok")
+    except Exception as e:
+        metrics.update(status="error", error=str(e))
+        raise
+    finally:
+        metrics["wall_seconds"] = round(time.perf_counter() - wall_started, 6)
+        metrics["cpu_seconds"] = round(time.thread_time() - cpu_started, 6)
+        metrics["max_rss_mb"] = _max_rss_mb()
+        if trace_memory:
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            metrics["memory_delta_mb"] = round((memory_after - memory_before) / 2 ** 20, 3)
+            metrics["memory_peak_mb"] = round((memory_peak - memory_before) / 2 ** 20, 3)
+        if profiler is not None:
+            profiler.disable()
+            makedirs(_config["profile_dir"], exist_ok=True)
+            profiler.dump_stats(join(_config["profile_dir"], f"{name}.prof"))
+        _emit(metrics)
+
+
+def instrumented(name: str | None = None) -> Callable[[Callable], Callable]:
+    """
+    Decorates a function so that every call is measured as a `stage`.
+
+    The rows in are those of the first argument and the rows out those of the
+    return value, when they are DataFrames (or tuples/lists/dicts of DataFrames).
+
+    Args:
+        name (str | None): Name of the stage; the function's name when None.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, count_rows(args[0]) if args else None) as metrics:
+                result = func(*args, **kwargs)
+                metrics["rows_out"] = count_rows(result)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_iter(name: str, iterable: Iterable) -> Iterator:
+    """
+    Measures the production of each item of a lazy iterable, e.g. a chunked `pd.read_csv`.
+
+    Args:
+        name (str): Name of the stage emitted for every item.
+        iterable (Iterable): The iterable to wrap.
+
+    Yields:
+        Any: The items of `iterable`.
+    """
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as metrics:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                metrics["status"] = "exhausted"
+                return
+            metrics["rows_out"] = count_rows(item)
+        yield item
@@ -0,0 +1,155 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Separates the parts of a natural key that spans several columns
+KEY_SEPARATOR = "\x1f"
+
+# Stands for a missing part of a natural key, so members differing elsewhere stay distinct
+NULL_KEY = "\x1e"
+
+
+def encode_natural_keys(members: pd.DataFrame, key_cols: list[str]) -> pd.Index:
+    """
+    Encodes the natural key columns of each row as one string.
+
+    Dates are written in a fixed format so the same member encodes identically in
+    every file, and after a round trip through the registry table. Missing values are
+    written as `NULL_KEY`.
+
+    Args:
+        members (pd.DataFrame): Rows holding the natural key columns.
+        key_cols (list[str]): Columns that make up the natural key.
+
+    Returns:
+        pd.Index: One encoded key per row.
+    """
+    encoded = None
+    for col in key_cols:
+        values = members[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+        values = values.astype(str).fillna(NULL_KEY)
+        encoded = values if encoded is None else encoded + KEY_SEPARATOR + values
+    return pd.Index(encoded, dtype=object)
+
+
+class KeyRegistry:
+    """
+    Maps natural keys to surrogate keys, per dimension, across chunks and runs.
+
+    Known members keep the surrogate key they were first given; only unseen members
+    are allocated new keys, numbered after the highest key of their dimension. Keys
+    allocated since the last `mark_saved` are reported by `pending` so they can be
+    persisted with the load that introduced them.
+    """
+
+    def __init__(self) -> None:
+        self._keys: dict[str, pd.Index] = {}
+        self._ids: dict[str, np.ndarray] = {}
+        self._pending: dict[str, tuple[list[pd.Index], list[np.ndarray]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "KeyRegistry":
+        """
+        Rebuilds a registry from rows with `dimension`, `natural_key` and `surrogate_key` columns.
+
+        Args:
+            frame (pd.DataFrame): Registry rows, e.g. read back from the registry table.
+
+        Returns:
+            KeyRegistry: Registry holding the given keys, with nothing pending.
+        """
+        registry = cls()
+        for dimension, dimension_df in frame.groupby("dimension"):
+            registry._keys[dimension] = pd.Index(dimension_df["natural_key"], dtype=object)
+            registry._ids[dimension] = dimension_df["surrogate_key"].to_numpy(dtype=np.int64)
+        return registry
+
+    def assign(self, dimension: str, members: pd.DataFrame, key_cols: list[str], id_col: str) -> pd.DataFrame:
+        """
+        Adds a surrogate key column to the dimension members, allocating keys only for unseen members.
+
+        Args:
+            dimension (str): Name the dimension's keys are registered under.
+            members (pd.DataFrame): Unique dimension members.
+            key_cols (list[str]): Columns that make up the natural key.
+            id_col (str): Name of the surrogate key column to add.
+
+        Returns:
+            pd.DataFrame: The members with the `id_col` column.
+        """
+        encoded = encode_natural_keys(members, key_cols)
+
+        with self._lock:
+            known_keys = self._keys.get(dimension, pd.Index([], dtype=object))
+            known_ids = self._ids.get(dimension, np.empty(0, dtype=np.int64))
+
+            # Hash lookup of every member in the known keys; -1 marks unseen members
+            positions = known_keys.get_indexer(encoded)
+            unseen = positions < 0
+
+            ids = np.empty(len(members), dtype=np.int64)
+            ids[~unseen] = known_ids[positions[~unseen]]
+
+            if unseen.any():
+                next_id = int(known_ids.max()) + 1 if len(known_ids) else 1
+                new_ids = np.arange(next_id, next_id + int(unseen.sum()), dtype=np.int64)
+                ids[unseen] = new_ids
+
+                new_keys = encoded[unseen]
+                self._keys[dimension] = known_keys.append(new_keys)
+                self._ids[dimension] = np.concatenate([known_ids, new_ids])
+                pending_keys, pending_ids = self._pending.setdefault(dimension, ([], []))
+                pending_keys.append(new_keys)
+                pending_ids.append(new_ids)
+
+        members = members.copy()
+        members[id_col] = ids
+        return members
+
+    def pending(self) -> pd.DataFrame:
+        """
+        Returns the keys allocated since the last `mark_saved`.
+
+        Returns:
+            pd.DataFrame: Rows with `dimension`, `natural_key` and `surrogate_key` columns.
+        """
+        with self._lock:
+            frames = [
+                pd.DataFrame({"dimension": dimension, "natural_key": np.concatenate(keys), "surrogate_key": np.concatenate(ids)})
+                for dimension, (keys, ids) in self._pending.items()
+            ]
+        if not frames:
+            return pd.DataFrame({"dimension": [], "natural_key": [], "surrogate_key": []})
+        return pd.concat(frames, ignore_index=True)
+
+    def restore(self, frame: pd.DataFrame) -> None:
+        """
+        Adds keys allocated by an interrupted run (see `pending`) back as pending keys.
+
+        Keys the registry already knows are ignored, so overlapping snapshots can be
+        restored one after another.
+
+        Args:
+            frame (pd.DataFrame): Rows with `dimension`, `natural_key` and `surrogate_key` columns.
+        """
+        with self._lock:
+            for dimension, dimension_df in frame.groupby("dimension"):
+                known_keys = self._keys.get(dimension, pd.Index([], dtype=object))
+                unseen = known_keys.get_indexer(dimension_df["natural_key"]) < 0
+                if not unseen.any():
+                    continue
+
+                new_keys = pd.Index(dimension_df["natural_key"][unseen], dtype=object)
+                new_ids = dimension_df["surrogate_key"][unseen].to_numpy(dtype=np.int64)
+                self._keys[dimension] = known_keys.append(new_keys)
+                self._ids[dimension] = np.concatenate([self._ids.get(dimension, np.empty(0, dtype=np.int64)), new_ids])
+                pending_keys, pending_ids = self._pending.setdefault(dimension, ([], []))
+                pending_keys.append(new_keys)
+                pending_ids.append(new_ids)
+
+    def mark_saved(self) -> None:
+        """Forgets the pending keys once they have been persisted."""
+        self._pending.clear()
@@ -0,0 +1,149 @@
+import glob
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from os.path import isdir, isfile, join
+from typing import Iterator
+import pandas as pd
+from pandas.api.types import union_categoricals
+from database.load_audit import file_fingerprint
+from dataload.dimensions import DIMENSION_PASSES
+from dataload.read_source import DATE_COLUMNS, read_source
+
+# Source columns each dimension builder reads, keyed by builder (see `transform_nodes`)
+BUILDER_COLUMNS = {**{pass_name: dimension_pass["columns"] for pass_name, dimension_pass in DIMENSION_PASSES.items()},
+                   "date_data": DATE_COLUMNS}
+
+
+def expand_sources(data_path: str) -> list[str]:
+    """
+    Expands a source argument into the CSV files it names.
+
+    Args:
+        data_path (str): A CSV file, a directory (all of its `*.csv` files) or a glob
+            pattern such as `incoming/shipments_*.csv`.
+
+    Returns:
+        list[str]: The files, sorted by path so loads are repeatable.
+
+    Raises:
+        FileNotFoundError: If no file matches.
+    """
+    if isfile(data_path):
+        return [data_path]
+    paths = glob.glob(join(data_path, "*.csv")) if isdir(data_path) else glob.glob(data_path)
+    paths = sorted(path for path in paths if isfile(path))
+    if not paths:
+        raise FileNotFoundError(f"no source files match {data_path}")
+    return paths
+
+
+def distinct_builder_rows(source_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Reduces source data to what the dimension builders read: the distinct rows of each
+    builder's columns, in first-occurrence order.
+
+    Args:
+        source_df (pd.DataFrame): Source data.
+
+    Returns:
+        dict[str, pd.DataFrame]: The distinct rows keyed by builder, as in `BUILDER_COLUMNS`.
+    """
+    return {builder: source_df[columns].drop_duplicates(ignore_index=True)
+            for builder, columns in BUILDER_COLUMNS.items()}
+
+
+def merge_builder_rows(files_rows: list[dict[str, pd.DataFrame]]) -> dict[str, pd.DataFrame]:
+    """
+    Merges the `distinct_builder_rows` of several files into those of their concatenation.
+
+    Every member first occurs in the distinct rows of the first file holding it, so the
+    distinct rows of the files' distinct rows, in file order, are those of all rows.
+
+    Args:
+        files_rows (list[dict[str, pd.DataFrame]]): The distinct rows of every file, in load order.
+
+    Returns:
+        dict[str, pd.DataFrame]: The distinct rows of all files keyed by builder.
+    """
+    return {builder: concat_sources([file_rows[builder] for file_rows in files_rows]).drop_duplicates(ignore_index=True)
+            for builder in BUILDER_COLUMNS}
+
+
+def _read_file(path: str, engine: str,
+               fingerprint: bool) -> tuple[pd.DataFrame, dict[str, pd.DataFrame], str | None]:
+    """Worker process: parses one file, reduces it for the dimension builders and hashes it if asked."""
+    source_df = read_source(path, engine=engine)
+    return source_df, distinct_builder_rows(source_df), file_fingerprint(path) if fingerprint else None
+
+
+def read_sources(paths: list[str], max_workers: int | None = None, engine: str = "c", fingerprint: bool = False,
+                 failures: dict[str, str] | None = None
+                 ) -> Iterator[tuple[str, pd.DataFrame, dict[str, pd.DataFrame], str | None]]:
+    """
+    Parses and pre-transforms source files in parallel worker processes, yielding them in the given order.
+
+    Each worker reads a whole file with `read_source` (typed columns, parsed dates),
+    reduces it to the distinct rows every dimension builder reads
+    (`distinct_builder_rows`) and optionally computes its `file_fingerprint`. Parsing
+    and the scans for dimension members thus scale with the cores, while the caller
+    merges the much smaller distinct rows (`merge_builder_rows`) and assigns the keys
+    in one process, in file order. A file is submitted as the result of an earlier one
+    is taken, so at most `max_workers` files are parsed ahead of the caller and memory
+    stays bounded however many files there are. A file that cannot be read is recorded
+    in `failures` and skipped; the others are still yielded.
+
+    Args:
+        paths (list[str]): Files to read.
+        max_workers (int | None): Number of worker processes; one per core when None.
+        engine (str): CSV parser, see `read_source`.
+        fingerprint (bool): Also hash every file, e.g. for the load audit.
+        failures (dict[str, str] | None): Filled with the error of every file that failed.
+
+    Yields:
+        tuple[str, pd.DataFrame, dict[str, pd.DataFrame], str | None]: Path, source data,
+            distinct rows of every dimension builder and content hash (None unless
+            `fingerprint`) of every file read.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # At most one file per worker is in flight, so parsed files do not pile up in
+        # memory while the caller loads the earlier ones
+        pending = iter(paths)
+        futures = deque((path, executor.submit(_read_file, path, engine, fingerprint))
+                        for path in islice(pending, max_workers))
+        while futures:
+            path, future = futures.popleft()
+            try:
+                source_df, builder_rows, file_hash = future.result()
+            except Exception as e:
+                if failures is not None:
+                    failures[path] = str(e)
+                source_df = None
+            for next_path in islice(pending, 1):
+                futures.append((next_path, executor.submit(_read_file, next_path, engine, fingerprint)))
+            if source_df is not None:
+                yield path, source_df, builder_rows, file_hash
+
+
+def concat_sources(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates source files read with `read_source`, keeping the categorical columns.
+
+    `pd.concat` turns categoricals with different categories into object columns; they
+    are combined with `union_categoricals` instead, with sorted categories as
+    `read_source` gives them.
+
+    Args:
+        frames (list[pd.DataFrame]): Source data of every file, in load order.
+
+    Returns:
+        pd.DataFrame: All rows, with a fresh index.
+    """
+    combined = pd.concat(frames, ignore_index=True)
+    for column in combined.columns:
+        if not isinstance(combined[column].dtype, pd.CategoricalDtype) and \
+                all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            combined[column] = union_categoricals([frame[column] for frame in frames], sort_categories=True)
+    return combined
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from dataload import tables_data
+from dataload.dimensions import DIMENSION_PASSES, FACT, extract_dimensions, fact_references
+from dataload.instrumentation import instrumented
+from dataload.read_source import DATE_COLUMNS
+from dataload.tables_data import report_unmatched
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+def distinct_rows(source: "pl.DataFrame", columns: list[str]) -> pd.DataFrame:
+    """
+    Returns the distinct rows of the given source columns, in first-occurrence order.
+
+    Args:
+        source (pl.DataFrame): Source data.
+        columns (list[str]): Columns to deduplicate on.
+
+    Returns:
+        pd.DataFrame: The distinct rows, as pandas for the dimension builders.
+    """
+    return source.lazy().select(columns).unique(maintain_order=True).collect().to_pandas()
+
+
+def _dimension(df_dim: pd.DataFrame, key: list[str]) -> "pl.LazyFrame":
+    """Converts a dimension table for a join, with its text key columns as plain strings."""
+    text_keys = [column for column in key if not pd.api.types.is_numeric_dtype(df_dim[column])]
+    return pl.from_pandas(df_dim).lazy().with_columns(pl.col(text_keys).cast(pl.String))
+
+
+def _date_key(column: str) -> "pl.Expr":
+    """Polars equivalent of `calendar_dim.date_key`."""
+    dates = pl.col(column).dt
+    return dates.year().cast(pl.Int32) * 10000 + dates.month().cast(pl.Int32) * 100 + dates.day().cast(pl.Int32)
+
+
+@instrumented("fact_data")
+def fact_data(source: "pl.DataFrame", dimension_tables: dict[str, pd.DataFrame],
+              sales_id_start: int = 102) -> pd.DataFrame:
+    """
+    Polars version of `tables_data.fact_data`: the same rows, keys and columns.
+
+    Each dimension in `FACT` is left-joined on its natural key, so rows whose member is 
+    missing are reported (see `report_unmatched`) and left out, as by the pandas version, 
+    rather than silently dropped by the join.
+
+    Args:
+        source (pl.DataFrame): Source data.
+        dimension_tables (dict[str, pd.DataFrame]): The dimension tables keyed by database
+            table name, including every dimension in `FACT`.
+        sales_id_start (int): First `sales_id` handed out to the source rows.
+
+    Returns:
+        pd.DataFrame: DataFrame containing shipment fact data.
+    """
+    references = fact_references()
+    key_columns = list(dict.fromkeys(column for _, key, _ in references for column in key))
+    fact_columns = list(dict.fromkeys(FACT["measures"] + key_columns + DATE_COLUMNS))
+    text_keys = [column for column in key_columns if not source.schema[column].is_numeric()]
+
+    fact = (source.lazy()
+            .select(fact_columns)
+            .with_row_index("sales_id", offset=sales_id_start)
+            .select(fact_columns + [pl.col("sales_id").cast(pl.Int64)])
+            .drop_nulls(subset=DATE_COLUMNS)
+            .with_columns(delivery_date_id=_date_key("delivery_date"), shipment_date_id=_date_key("shipment_date"))
+            .with_columns(pl.col(text_keys).cast(pl.String)))
+
+    # Left joins keep the rows whose member is missing, flagged so they can be reported
+    for dimension, key, id_col in references:
+        members = _dimension(dimension_tables[dimension][key + ([id_col] if id_col else [])], key)
+        fact = fact.join(members.with_columns(pl.lit(True).alias(f"in_{dimension}")), on=key, how="left",
+                         nulls_equal=True, maintain_order="left", validate="m:1")
+    fact = fact.collect()
+
+    keep = np.ones(fact.height, dtype=bool)
+    for dimension, key, _ in references:
+        unmatched = keep & fact[f"in_{dimension}"].is_null().to_numpy()
+        if unmatched.any():
+            report_unmatched(dimension, fact.select(key).to_pandas(), unmatched)
+        keep &= ~unmatched
+
+    output_columns = (FACT["measures"] + ["sales_id", "delivery_date_id", "shipment_date_id"]
+                      + [id_col for _, _, id_col in references if id_col is not None])
+    return fact.filter(pl.Series(keep)).select(output_columns).to_pandas()
+
+
+class PolarsBackend:
+    """
+    Builds the fact table with Polars, and the dimensions with the pandas builders.
+
+    The source is converted to Polars once. Only the fact table, which has a row per
+    source row, is built with a lazy Polars query. Each dimension pass and the date
+    tables are built by the pandas builders (`extract_dimensions`,
+    `tables_data.date_data`, which assign the keys). They run on the distinct rows of
+    their columns, computed by Polars and converted back to pandas. Those rows hold
+    every member's first occurrence in the same order as the full source, so the same
+    keys are assigned. The conversions cost time, and on the benchmark data this
+    backend is not faster than pandas; compare them with
+    `benchmarks/check_backend_parity.py`. The tables are returned as pandas
+    DataFrames, like the pandas backend's.
+    """
+
+    name = "polars"
+
+    def __init__(self) -> None:
+        if pl is None:
+            raise ImportError("the polars backend requires polars (pip install polars)")
+
+    def prepare(self, data_df: pd.DataFrame) -> "pl.DataFrame":
+        return pl.from_pandas(data_df)
+
+    def dimensions(self, source, pass_name, registry=None):
+        return extract_dimensions(distinct_rows(source, DIMENSION_PASSES[pass_name]["columns"]), pass_name, registry,
+                                  distinct=True)
+
+    def date_data(self, source, registry=None):
+        return tables_data.date_data(distinct_rows(source, DATE_COLUMNS), registry)
+
+    def fact_data(self, source, dimension_tables, sales_id_start=102):
+        return fact_data(source, dimension_tables, sales_id_start)
@@ -0,0 +1,73 @@
+from typing import Iterator
+import pandas as pd
+
+# Declared type of every source column the table builders use; other columns are not read.
+# Repetitive text columns are categoricals, so `drop_duplicates` and the merges in
+# `tables_data` compare integer codes instead of strings. `total_cost` stays float64
+# because it is summed into the revenue reports.
+SOURCE_DTYPES = {
+    "shipment_id": "int32",
+    "total_cost": "float64",
+    "quantity": "int16",
+    "product_name": "category",
+    "unit_price": "int32",
+    "category": "category",
+    "customer_name": "str",
+    "customer_segment": "category",
+    "payment_method": "category",
+    "customer_city": "category",
+    "customer_state": "category",
+    "customer_country": "category",
+    "carrier_name": "category",
+    "carrier_rating": "int8",
+    "destination_city": "category",
+    "destination_state": "category",
+    "destination_country": "category",
+    "origin_city": "category",
+    "origin_state": "category",
+    "origin_country": "category",
+    "mode_of_transport": "category",
+    "shipping_priority": "category",
+}
+
+# Parsed while reading rather than in a second pass
+DATE_COLUMNS = ["shipment_date", "delivery_date"]
+
+SOURCE_COLUMNS = list(SOURCE_DTYPES) + DATE_COLUMNS
+
+# CSV parsers accepted by `read_source`
+CSV_ENGINES = ("c", "pyarrow")
+
+
+def read_source(data_path: str, chunksize: int | None = None,
+                engine: str = "c") -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """
+    Reads the source CSV with the declared column types.
+
+    Only the columns in `SOURCE_COLUMNS` are read, with the dtypes of `SOURCE_DTYPES`,
+    and the date columns are parsed while reading.
+
+    Args:
+        data_path (str): Path to the CSV file containing source data.
+        chunksize (int | None): If given, return an iterator of DataFrames of this many rows.
+        engine (str): 'c' for the pandas parser or 'pyarrow' for the multi-threaded Arrow
+            CSV reader (requires pyarrow; cannot read in chunks).
+
+    Returns:
+        pd.DataFrame | Iterator[pd.DataFrame]: The source data, or its chunks.
+
+    Raises:
+        Exception: If the engine is unknown, cannot read chunks, or the file does not
+            match the schema.
+    """
+    try:
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"unknown CSV engine '{engine}', expected one of {CSV_ENGINES}")
+        if engine == "pyarrow" and chunksize:
+            raise ValueError("the pyarrow engine cannot read in chunks; use the 'c' engine with chunksize")
+
+        return pd.read_csv(data_path, usecols=SOURCE_COLUMNS, dtype=SOURCE_DTYPES, parse_dates=DATE_COLUMNS,
+                           chunksize=chunksize, engine=engine)
+
+    except Exception as e:
+        raise Exception(f"Error reading source data from {data_path}: {e}")
@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+# A DAG node: the function to run and the names of the nodes whose results it takes,
+# passed positionally in the same order
+Node = tuple[Callable[..., Any], list[str]]
+
+
+def run_dag(nodes: dict[str, Node], max_workers: int | None = None,
+            on_node_done: Callable[[str, Any], None] | None = None) -> tuple[dict[str, Any], dict[str, tuple[float, float]]]:
+    """
+    Runs a DAG of functions on a thread pool, starting each node as soon as its parents finish.
+
+    Independent nodes run at the same time. `on_node_done` is called on the calling
+    thread as each node finishes, so it can safely use objects that are not thread-safe
+    (e.g. a database session) while the remaining nodes keep running.
+
+    Args:
+        nodes (dict[str, Node]): Nodes keyed by name.
+        max_workers (int | None): Size of the thread pool; None lets the executor decide.
+        on_node_done (Callable[[str, Any], None] | None): Called with each node's name and result.
+
+    Returns:
+        tuple[dict[str, Any], dict[str, tuple[float, float]]]: The node results, and each
+            node's start and end time in seconds since the run started.
+
+    Raises:
+        Exception: If a node depends on an unknown node, the graph has a cycle, or a node fails.
+    """
+    for name, (_, parents) in nodes.items():
+        unknown = [parent for parent in parents if parent not in nodes]
+        if unknown:
+            raise ValueError(f"node '{name}' depends on unknown nodes {unknown}")
+
+    results: dict[str, Any] = {}
+    timings: dict[str, tuple[float, float]] = {}
+    pending = dict(nodes)
+    started = time.perf_counter()
+
+    def timed(name: str, func: Callable[..., Any], args: list[Any]) -> Any:
+        node_started = time.perf_counter() - started
+        result = func(*args)
+        timings[name] = (node_started, time.perf_counter() - started)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: dict[Future, str] = {}
+        while pending or running:
+            # Submit every node whose parents have all finished
+            for name, (func, parents) in list(pending.items()):
+                if all(parent in results for parent in parents):
+                    running[executor.submit(timed, name, func, [results[p] for p in parents])] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"dependency cycle between nodes {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                if on_node_done is not None:
+                    on_node_done(name, results[name])
+
+    return results, timings
+
+
+def critical_path(nodes: dict[str, Node], timings: dict[str, tuple[float, float]]) -> tuple[list[str], float]:
+    """
+    Finds the chain of dependent nodes with the longest total run time.
+
+    Args:
+        nodes (dict[str, Node]): Nodes keyed by name.
+        timings (dict[str, tuple[float, float]]): Start and end times from `run_dag`.
+
+    Returns:
+        tuple[list[str], float]: The node names on the critical path, in run order,
+            and their summed duration in seconds.
+    """
+    longest: dict[str, tuple[float, list[str]]] = {}
+
+    def visit(name: str) -> tuple[float, list[str]]:
+        if name not in longest:
+            start, end = timings[name]
+            parent_paths = [visit(parent) for parent in nodes[name][1]]
+            parent_total, parent_path = max(parent_paths, default=(0.0, []), key=lambda path: path[0])
+            longest[name] = (parent_total + end - start, parent_path + [name])
+        return longest[name]
+
+    total, path = max((visit(name) for name in nodes), key=lambda path: path[0])
+    return path, total
+
+
+def print_dag_report(nodes: dict[str, Node], timings: dict[str, tuple[float, float]]) -> None:
+    """
+    Prints each node's timing and the critical path of a `run_dag` run.
+
+    Args:
+        nodes (dict[str, Node]): Nodes keyed by name.
+        timings (dict[str, tuple[float, float]]): Start and end times from `run_dag`.
+    """
+    for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        print(f"{name}: {end - start:.3f}s (started at {start:.3f}s)")
+
+    path, total = critical_path(nodes, timings)
+    wall_time = max(end for _, end in timings.values())
+    print(f"Critical path: {' -> '.join(path)} ({total:.3f}s of {wall_time:.3f}s wall time)")
@@ -0,0 +1,81 @@
+import pandas as pd
+from dataload import tables_data
+from dataload.dimensions import extract_dimensions
+
+# DataFrame libraries the tables can be built with
+BACKENDS = ("pandas", "polars")
+
+
+class PandasBackend:
+    """
+    Builds the tables with the pandas builders of `tables_data`.
+
+    A backend converts the source data once with `prepare` and exposes one method per
+    builder, taking the prepared source and returning the same pandas tables as
+    `tables_data` and `extract_dimensions` (which runs one pass of the dimension plan),
+    so the database load and export work with any backend.
+    """
+
+    name = "pandas"
+
+    def prepare(self, data_df: pd.DataFrame) -> pd.DataFrame:
+        return data_df
+
+    def dimensions(self, source, pass_name, registry=None):
+        return extract_dimensions(source, pass_name, registry)
+
+    def date_data(self, source, registry=None):
+        return tables_data.date_data(source, registry)
+
+    def fact_data(self, source, dimension_tables, sales_id_start=102):
+        return tables_data.fact_data(source, dimension_tables, sales_id_start)
+
+
+def get_backend(name: str = "pandas"):
+    """
+    Returns the table-building backend of the given name.
+
+    Args:
+        name (str): One of `BACKENDS`.
+
+    Returns:
+        PandasBackend | PolarsBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the backend's library is not installed.
+    """
+    if name == "pandas":
+        return PandasBackend()
+    if name == "polars":
+        from dataload.polars_backend import PolarsBackend
+        return PolarsBackend()
+    raise ValueError(f"unknown backend '{name}', expected one of {BACKENDS}")
+
+
+def compare_tables(expected: dict[str, pd.DataFrame], actual: dict[str, pd.DataFrame]) -> dict[str, str]:
+    """
+    Compares two sets of tables row by row and value by value.
+
+    Dtypes are not compared (e.g. a categorical and a string column holding the same
+    values are equal), since the database stores the values only.
+
+    Args:
+        expected (dict[str, pd.DataFrame]): Reference tables keyed by table name.
+        actual (dict[str, pd.DataFrame]): Tables to check, keyed by table name.
+
+    Returns:
+        dict[str, str]: Description of the difference of every table that differs.
+    """
+    differences = {}
+    for table_name in sorted(set(expected) | set(actual)):
+        if table_name not in expected or table_name not in actual:
+            differences[table_name] = "missing from one side"
+            continue
+        try:
+            pd.testing.assert_frame_equal(expected[table_name].reset_index(drop=True),
+                                          actual[table_name].reset_index(drop=True),
+                                          check_dtype=False, check_categorical=False, check_index_type=False)
+        except AssertionError as e:
+            differences[table_name] = str(e)
+    return differences
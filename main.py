@@ -1,12 +1,30 @@
 from database.db_connect import db_connection
-from database.db_query import query_table
 from config.config import dbconfig
 from database.create_table import create_db_table
-from database.populate_db_table import populate_tables
-import pandas as pd
+from database.populate_db_table import populate_tables, populate_tables_in_chunks, populate_warehouse
+from database.duckdb_warehouse import WAREHOUSE_DIR, ParquetWarehouse
+from database.query_cache import QueryCache
+from database.query_runner import run_queries
+from database.load_audit import file_fingerprint, file_ingested, record_file
+from database.report_queries import REPORT_QUERIES
+from database.query_log import configure_query_log
+from dataload.instrumentation import configure_metrics, instrument_iter, stage
+from dataload.read_source import CSV_ENGINES, read_source
+from dataload.flat_tables import FLATTEN_MODES
+from dataload.multi_source import concat_sources, expand_sources, merge_builder_rows, read_sources
+from dataload.transform_backend import BACKENDS
+from dataload.checkpoints import CHECKPOINT_DIR
+import argparse
+import logging
 
 
-def main(data_path: str) -> None:
+def main(data_path: str, chunksize: int | None = None, export_format: str | None = None, 
+         export_dir: str = "output", export_in_background: bool = False, loader: str = "insert", 
+         max_workers: int = 1, incremental: bool = False, query_cache_dir: str | None = None, 
+         defer_indexes: bool = False, query_workers: int | None = None, csv_engine: str = "c", 
+         backend: str = "pandas", skip_ingested: bool = False, checkpoint_dir: str | None = None, 
+         partition_by_month: bool = False, source_workers: int | None = None, 
+         flatten: str | None = None, warehouse_dir: str | None = None) -> None:
   """
   Main function to orchestrate data processing, database operations, and query execution.
 
@@ -15,62 +33,240 @@ def main(data_path: str) -> None:
   executes a list of provided query statements.
 
   Args:
-      data_path (str): Path to the CSV file containing source data.
+      data_path (str): Path to the CSV file containing source data, or a directory or glob 
+          pattern of several files. Several files are parsed in parallel worker processes 
+          and loaded together, in path order; files that fail are reported and skipped.
+      chunksize (int | None): If given, stream the CSV in chunks of this many rows 
+          and insert each chunk before reading the next, keeping memory flat. With 
+          several files, each file is loaded as one chunk instead.
+      export_format (str | None): Format the tables are also exported to ('excel', 
+          'parquet' or 'csv'), or 'none' to skip the export. None picks 'parquet' with 
+          `chunksize` and 'excel' otherwise; Excel cannot be written chunk by chunk, so 
+          an explicit 'excel' is rejected with `chunksize`.
+      export_dir (str): Directory the exported files are written to.
+      export_in_background (bool): Write the export while the database load runs.
+      loader (str): 'insert' for ORM inserts or 'copy' for COPY-based bulk loading.
+      max_workers (int): Number of dimension tables built at the same time.
+      incremental (bool): Keep the existing tables and add only new dimension members 
+          and new shipments, instead of dropping and recreating every table.
+      query_cache_dir (str | None): Directory of the report result cache, or None to 
+          always query the database.
+      defer_indexes (bool): Drop the secondary indexes during the load and rebuild them after.
+      query_workers (int | None): Number of report queries run at the same time; all of 
+          them when None.
+      csv_engine (str): 'c' or 'pyarrow' parser for the CSV (pyarrow cannot read in chunks).
+      backend (str): 'pandas' or 'polars', the DataFrame library the tables are built with.
+      skip_ingested (bool): Skip the file, or the blocks of rows, already recorded in the 
+          load audit and load the rest incrementally.
+      checkpoint_dir (str | None): Checkpoint each table builder's result there, so a 
+          failed load resumes from the builders that finished.
+      partition_by_month (bool): Create the fact table range-partitioned by shipment month 
+          (PostgreSQL), with a partition added for every new month loaded.
+      source_workers (int | None): Number of processes parsing the files when there are 
+          several; one per core when None.
+      flatten (str | None): Also load denormalized star dimensions ('star'), a wide 
+          reporting table ('wide') or both ('both'), refreshed with every load.
+      warehouse_dir (str | None): Instead of loading the database, write the tables as a 
+          Parquet warehouse there and run the reports on it in-process with DuckDB. No 
+          database connection is made; the export and database options do not apply.
   """
 
+  if export_format is None:
+      # A workbook cannot be written chunk by chunk
+      export_format = "parquet" if chunksize else "excel"
+  elif chunksize and export_format == "excel" and warehouse_dir is None:
+      raise ValueError("Excel export cannot be written in chunks; use 'parquet' or 'csv' with chunksize")
+  if export_format == "none":
+      export_format = None
+
   try:
-      # Read data from CSV file
-      datadf = pd.read_csv(data_path)
+      if warehouse_dir is not None:
+          # No database server: write the tables as Parquet and query them with DuckDB
+          paths = expand_sources(data_path)
+          failures: dict[str, str] = {}
+          if len(paths) > 1:
+              chunks = ((source_df, builder_rows) for _, source_df, builder_rows, _ 
+                        in read_sources(paths, source_workers, csv_engine, failures=failures))
+          elif chunksize:
+              chunks = read_source(paths[0], chunksize=chunksize, engine=csv_engine)
+          else:
+              chunks = [read_source(paths[0], engine=csv_engine)]
+          populate_warehouse(instrument_iter("read_csv", chunks), warehouse_dir, max_workers=max_workers, 
+                             backend=backend, flatten=flatten)
+          for path, error in failures.items():
+              print(f"Failed to read {path}: {error}")
 
-      # Convert string date values to datetime objects (assuming suitable format)
-      datadf['shipment_date'] = pd.to_datetime(datadf['shipment_date'])
-      datadf['delivery_date'] = pd.to_datetime(datadf['delivery_date'])
+          warehouse = ParquetWarehouse(warehouse_dir)
+          query_results = run_queries(warehouse, REPORT_QUERIES, max_workers=query_workers)
+          for query_result in query_results.values():
+              print(query_result)
+          return
 
       # Establish database connection (assuming `db_connection` function exists)
       connection, engine = db_connection(dbconfig['USERNAME'], dbconfig['PASSWORD'], dbconfig['HOST'], 'courier_delivery')
+      # Every step checks out its own connections from the engine's pool
+      connection.close()
+
+      # Skipping what is already loaded only makes sense when the loaded data is kept
+      incremental = incremental or skip_ingested
 
       # Create database tables (assuming `create_db_table` function exists)
-      create_db_table(engine)
-
-      # Populate database tables with processed data (assuming `populate_tables` function exists)
-      populate_tables(engine, datadf)
-
-      # Define query statements (assuming suitable query syntax for the database)
-      query_statements = [
-          # Calculating total cost revenue by customer name
-          """
-          SELECT c.customer_segment, sum(f.total_cost) AS total_revenue
-          FROM fact_sales_table f
-          INNER JOIN dim_customer c ON c.customer_id = f.customer_id
-          GROUP BY c.customer_segment
-          """,
-
-          # Analyzing cost performance by courier name
-          """
-          SELECT c.carrier_name, sum(f.total_cost) AS total_cost
-          FROM fact_sales_table f
-          INNER JOIN dim_courier c ON f.courier_id = c.courier_id
-          GROUP BY c.carrier_name
-          """,
-
-          # Analyzing quantity of product by shipment date
-          """
-          SELECT d.month, d.week_day, AVG(f.quantity) AS avg_quantity_shipped
-          FROM fact_sales_table f
-          INNER JOIN dim_shipment_date ds ON ds.shipment_date_id = f.shipment_date_id
-          INNER JOIN dim_date d ON d.date_id = ds.date_id
-          GROUP BY d.month, d.week_day
-          """,
-      ]
-
-      # Execute each query statement and print the result
-      for statement in query_statements:
-          query_result = query_table(statement, connection)
+      create_db_table(engine, rebuild=not incremental, partition_by_month=partition_by_month)
+
+      paths = expand_sources(data_path)
+      multiple_files = len(paths) > 1
+      if not multiple_files:
+          data_path = paths[0]
+
+      file_hash = file_fingerprint(data_path) if skip_ingested and not multiple_files else None
+      already_loaded = file_hash is not None and file_ingested(engine, file_hash)
+      if multiple_files:
+          # Parse and pre-transform the files in worker processes; the keys are assigned here, in file order
+          failures: dict[str, str] = {}
+          loaded_files: list[tuple[str, str | None]] = []
+
+          def new_sources():
+              for path, source_df, builder_rows, source_hash in read_sources(paths, source_workers, csv_engine, 
+                                                                             skip_ingested, failures):
+                  if source_hash is not None and file_ingested(engine, source_hash):
+                      print(f"{path} was already loaded; skipped")
+                      continue
+                  loaded_files.append((path, source_hash))
+                  yield source_df, builder_rows
+
+          if chunksize:
+              # Each file is inserted as one chunk while the workers parse the next ones
+              populate_tables_in_chunks(engine, instrument_iter("read_csv", new_sources()), 
+                                        export_format=export_format, export_dir=export_dir, 
+                                        export_in_background=export_in_background, loader=loader, 
+                                        max_workers=max_workers, incremental=incremental, 
+                                        defer_indexes=defer_indexes, backend=backend, 
+                                        skip_ingested=skip_ingested, source_path=data_path, 
+                                        checkpoint_dir=checkpoint_dir, flatten=flatten)
+          else:
+              with stage("read_csv") as metrics:
+                  sources = list(new_sources())
+                  metrics["rows_out"] = sum(len(source_df) for source_df, _ in sources)
+
+              if sources:
+                  # The workers' distinct dimension rows are merged rather than rescanning every row
+                  populate_tables(engine, concat_sources([source_df for source_df, _ in sources]), 
+                                  export_format=export_format, export_dir=export_dir, 
+                                  export_in_background=export_in_background, loader=loader, 
+                                  max_workers=max_workers, incremental=incremental, 
+                                  defer_indexes=defer_indexes, backend=backend, skip_ingested=skip_ingested, 
+                                  source_path=data_path, checkpoint_dir=checkpoint_dir, flatten=flatten, 
+                                  builder_rows=merge_builder_rows([builder_rows for _, builder_rows in sources]))
+
+          for path, source_hash in loaded_files:
+              if source_hash is not None:
+                  record_file(engine, path, source_hash)
+          print(f"Loaded {len(loaded_files)} of {len(paths)} files")
+          for path, error in failures.items():
+              print(f"Failed to read {path}: {error}")
+      elif already_loaded:
+          print(f"{data_path} was already loaded; nothing to do")
+      elif chunksize:
+          # Read, transform and insert the CSV file one chunk at a time, with the declared column types
+          chunks = read_source(data_path, chunksize=chunksize, engine=csv_engine)
+          chunks = instrument_iter("read_csv", chunks)
+          populate_tables_in_chunks(engine, chunks, export_format=export_format, export_dir=export_dir, 
+                                    export_in_background=export_in_background, loader=loader, 
+                                    max_workers=max_workers, incremental=incremental, 
+                                    defer_indexes=defer_indexes, backend=backend, 
+                                    skip_ingested=skip_ingested, source_path=data_path, 
+                                    checkpoint_dir=checkpoint_dir, flatten=flatten)
+      else:
+          with stage("read_csv") as metrics:
+              # Read the used columns of the CSV file with their declared types, parsing the dates
+              datadf = read_source(data_path, engine=csv_engine)
+              metrics["rows_out"] = len(datadf)
+
+          # Populate database tables with processed data (assuming `populate_tables` function exists)
+          populate_tables(engine, datadf, export_format=export_format, export_dir=export_dir, 
+                          export_in_background=export_in_background, loader=loader, 
+                          max_workers=max_workers, incremental=incremental, defer_indexes=defer_indexes, 
+                          backend=backend, skip_ingested=skip_ingested, source_path=data_path, 
+                          checkpoint_dir=checkpoint_dir, flatten=flatten)
+
+      if file_hash is not None and not already_loaded:
+          record_file(engine, data_path, file_hash)
+
+      # Execute the report queries concurrently and print the results, from the cache when one is configured
+      query_cache = QueryCache(query_cache_dir) if query_cache_dir else None
+      query_results = run_queries(engine, REPORT_QUERIES, max_workers=query_workers, query_cache=query_cache)
+      for query_result in query_results.values():
           print(query_result)
 
   except Exception as e:
       raise Exception(f"Error: {e}")
   
 if __name__ == "__main__": 
-    main("raw_data.csv")
+    parser = argparse.ArgumentParser(description="Load courier shipment data into the snowflake schema.")
+    parser.add_argument("data_path", nargs="?", default="raw_data.csv", 
+                        help="Source CSV file, or a directory or glob pattern of several files.")
+    parser.add_argument("--source-workers", type=int, default=None, 
+                        help="Processes parsing the source files when there are several (default: one per core).")
+    parser.add_argument("--chunksize", type=int, default=None, 
+                        help="Stream the CSV in chunks of this many rows instead of reading it at once.")
+    parser.add_argument("--export", choices=["excel", "parquet", "csv", "none"], default=None, 
+                        help="Format the tables are also exported to, or 'none' to skip the export "
+                             "(default: excel, or parquet with --chunksize).")
+    parser.add_argument("--export-dir", default="output", help="Directory the exported files are written to.")
+    parser.add_argument("--export-in-background", action="store_true", 
+                        help="Write the export while the database load runs.")
+    parser.add_argument("--loader", choices=["insert", "copy"], default="insert", 
+                        help="Load with ORM inserts or with COPY-based bulk loading.")
+    parser.add_argument("--workers", type=int, default=1, 
+                        help="Number of dimension tables built at the same time.")
+    parser.add_argument("--incremental", action="store_true", 
+                        help="Keep existing tables and add only new members and shipments (default: full rebuild).")
+    parser.add_argument("--query-cache", default=None, metavar="DIR", 
+                        help="Cache report results in DIR until the next load.")
+    parser.add_argument("--defer-indexes", action="store_true", 
+                        help="Drop secondary indexes during the load and rebuild them afterwards.")
+    parser.add_argument("--partition-by-month", action="store_true", 
+                        help="Partition the fact table by shipment month (PostgreSQL).")
+    parser.add_argument("--flatten", choices=FLATTEN_MODES, default=None, 
+                        help="Also load star dimensions, a wide reporting table, or both.")
+    parser.add_argument("--warehouse", nargs="?", const=WAREHOUSE_DIR, default=None, metavar="DIR", 
+                        help=f"Write the tables as Parquet and query them with DuckDB instead of the "
+                             f"database (default DIR: {WAREHOUSE_DIR}).")
+    parser.add_argument("--query-workers", type=int, default=None, 
+                        help="Number of report queries run at the same time (default: all of them).")
+    parser.add_argument("--csv-engine", choices=CSV_ENGINES, default="c", 
+                        help="CSV parser; 'pyarrow' reads with multiple threads but not in chunks.")
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas", 
+                        help="DataFrame library the tables are built with ('polars' builds the fact table with Polars).")
+    parser.add_argument("--skip-ingested", action="store_true", 
+                        help="Skip files and row blocks already loaded (implies --incremental).")
+    parser.add_argument("--checkpoint-dir", nargs="?", const=CHECKPOINT_DIR, default=None, metavar="DIR", 
+                        help=f"Checkpoint the built tables so a failed load resumes (default DIR: {CHECKPOINT_DIR}).")
+    parser.add_argument("--metrics-file", default=None, 
+                        help="Append per-stage timing, CPU, memory and row counts to this file as JSON lines.")
+    parser.add_argument("--log-metrics", action="store_true", help="Log the per-stage metrics to stderr.")
+    parser.add_argument("--query-log", default=None, metavar="FILE", 
+                        help="Log every report query's latency, rows and size to FILE as JSON lines.")
+    parser.add_argument("--slow-query-ms", type=float, default=None, metavar="MS", 
+                        help="Capture the plan of queries slower than MS milliseconds (default: 1000).")
+    parser.add_argument("--trace-memory", action="store_true", 
+                        help="Record each stage's Python allocations with tracemalloc (slower).")
+    parser.add_argument("--profile-stage", default=None, metavar="STAGE", 
+                        help="Write a cProfile dump of this stage, e.g. fact_data, to STAGE.prof.")
+    args = parser.parse_args()
+    if args.export == "excel" and args.chunksize and args.warehouse is None:
+        parser.error("--export excel cannot be written in chunks; use --export parquet or csv with --chunksize")
+    if args.log_metrics:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    configure_metrics(args.metrics_file, trace_memory=args.trace_memory, profile_stage=args.profile_stage)
+    if args.query_log or args.slow_query_ms is not None:
+        configure_query_log(args.query_log, slow_ms=args.slow_query_ms if args.slow_query_ms is not None else 1000.0)
+    main(args.data_path, chunksize=args.chunksize, export_format=args.export, export_dir=args.export_dir, 
+         export_in_background=args.export_in_background, loader=args.loader, max_workers=args.workers, 
+         incremental=args.incremental, query_cache_dir=args.query_cache, 
+         defer_indexes=args.defer_indexes, query_workers=args.query_workers, 
+         csv_engine=args.csv_engine, backend=args.backend, 
+         skip_ingested=args.skip_ingested, checkpoint_dir=args.checkpoint_dir, 
+         partition_by_month=args.partition_by_month, source_workers=args.source_workers, 
+         flatten=args.flatten, warehouse_dir=args.warehouse)
         
\ No newline at end of file
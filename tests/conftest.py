@@ -0,0 +1,25 @@
+import sys
+from os.path import abspath, dirname, join
+import pytest
+
+# The packages are imported from the repository root, as `main.py` does
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from benchmarks.generate_shipments import write_shipments_csv  # noqa: E402
+
+
+@pytest.fixture
+def shipments_csv(tmp_path) -> str:
+    """A small synthetic shipment CSV, spanning several shipment months."""
+    path = str(tmp_path / "shipments.csv")
+    write_shipments_csv(path, 400, carriers=5, customers=40, products=12, cities=8, days=90)
+    return path
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """A file-backed SQLite engine, disposed after the test."""
+    from sqlalchemy import create_engine
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
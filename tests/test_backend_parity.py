@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from database.populate_db_table import build_tables
+from dataload.key_registry import KeyRegistry
+from dataload.read_source import read_source
+from dataload.transform_backend import compare_tables
+
+pytest.importorskip("polars")
+
+
+@pytest.mark.parametrize("chunks", [1, 3])
+def test_polars_builds_the_same_tables_as_pandas(shipments_csv, chunks):
+    data_df = read_source(shipments_csv)
+    registries = {"pandas": KeyRegistry(), "polars": KeyRegistry()}
+
+    # Chunks share a registry per backend, so the keys reused across chunks are compared too
+    sales_id_start = 102
+    for rows in np.array_split(np.arange(len(data_df)), chunks):
+        chunk_df = data_df.iloc[rows]
+        tables = {backend: build_tables(chunk_df, registry, sales_id_start, backend=backend, flatten="both")
+                  for backend, registry in registries.items()}
+
+        assert compare_tables(tables["pandas"], tables["polars"]) == {}
+        assert len(tables["polars"]["fact_sales_table"]) == len(chunk_df)
+        sales_id_start += len(chunk_df)
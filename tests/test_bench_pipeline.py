@@ -0,0 +1,10 @@
+from benchmarks.bench_pipeline import run_pipeline
+
+
+def test_run_pipeline_smoke(shipments_csv, sqlite_engine):
+    stages = {stage["stage"]: stage for stage in run_pipeline(shipments_csv, sqlite_engine)}
+
+    assert stages["read_csv"]["rows"] == 400
+    assert stages["insert.fact_sales_table"]["rows"] > 0
+    assert "insert.star_courier" not in stages
+    assert any(name.startswith("query.") for name in stages)
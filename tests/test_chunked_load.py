@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from sqlalchemy import inspect
+from database import populate_db_table
+from database.create_table import create_db_table
+from database.populate_db_table import PER_SHIPMENT_TABLES, drop_loaded_members, populate_tables, populate_tables_in_chunks
+from dataload.read_source import read_source
+
+
+def _tables(first_id: int) -> dict[str, pd.DataFrame]:
+    return {"dim_category": pd.DataFrame({"category": ["A", "B"], "category_id": [1, 2]}),
+            "dim_shipping": pd.DataFrame({"shipment_id": [first_id, first_id + 1], "prior_trans_id": [1, 1]})}
+
+
+def test_only_shared_dimension_keys_are_kept_between_chunks():
+    loaded: dict[str, pd.Index] = {}
+    drop_loaded_members(_tables(1), loaded)
+    second = _tables(3)
+    drop_loaded_members(second, loaded)
+
+    assert second["dim_category"].empty
+    assert len(second["dim_shipping"]) == 2
+    assert not set(PER_SHIPMENT_TABLES) & set(loaded)
+    assert list(loaded["dim_category"]) == [1, 2]
+
+
+def _index_count(engine, table_name: str = "fact_sales_table") -> int:
+    return len(inspect(engine).get_indexes(table_name))
+
+
+def test_deferred_indexes_are_rebuilt_when_a_later_chunk_fails(shipments_csv, sqlite_engine):
+    create_db_table(sqlite_engine)
+    indexes_before = _index_count(sqlite_engine)
+
+    def chunks():
+        yield from read_source(shipments_csv, chunksize=200)
+        raise ValueError("unreadable chunk")
+
+    with pytest.raises(Exception, match="unreadable chunk"):
+        populate_tables_in_chunks(sqlite_engine, chunks(), defer_indexes=True)
+
+    assert indexes_before > 0
+    assert _index_count(sqlite_engine) == indexes_before
+
+
+def test_deferred_indexes_are_rebuilt_when_the_load_fails(shipments_csv, sqlite_engine, monkeypatch):
+    create_db_table(sqlite_engine)
+    indexes_before = _index_count(sqlite_engine)
+
+    def fail(connection, sales_id_start):
+        raise ValueError("aggregates unavailable")
+
+    monkeypatch.setattr(populate_db_table, "update_aggregates", fail)
+    with pytest.raises(Exception, match="aggregates unavailable"):
+        populate_tables(sqlite_engine, read_source(shipments_csv), defer_indexes=True)
+
+    assert _index_count(sqlite_engine) == indexes_before
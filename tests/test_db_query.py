@@ -0,0 +1,30 @@
+from sqlalchemy import text
+from database.db_query import stream_query
+
+
+def test_stream_query_leaves_the_connection_unchanged(sqlite_engine):
+    with sqlite_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE numbers (n INTEGER)"))
+        connection.execute(text("INSERT INTO numbers (n) VALUES (:n)"), [{"n": n} for n in range(25)])
+
+    with sqlite_engine.connect() as connection:
+        batches = stream_query("SELECT n FROM numbers ORDER BY n", connection, batch_size=10)
+        first = next(batches)
+        # Stopping early closes the cursor
+        batches.close()
+
+        assert list(first["n"]) == list(range(10))
+        assert "stream_results" not in connection.get_execution_options()
+        assert "yield_per" not in connection.get_execution_options()
+        assert connection.execute(text("SELECT count(*) FROM numbers")).scalar() == 25
+
+
+def test_stream_query_yields_every_row_in_batches(sqlite_engine):
+    with sqlite_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE numbers (n INTEGER)"))
+        connection.execute(text("INSERT INTO numbers (n) VALUES (:n)"), [{"n": n} for n in range(25)])
+
+    with sqlite_engine.connect() as connection:
+        sizes = [len(batch) for batch in stream_query("SELECT n FROM numbers", connection, batch_size=10)]
+
+    assert sizes == [10, 10, 5]
@@ -0,0 +1,34 @@
+import pytest
+from database.populate_db_table import build_tables
+from dataload.dimensions import DIMENSION_PASSES, DIMENSIONS, compile_dimensions
+from dataload.read_source import read_source
+from dataload.transform_backend import compare_tables
+
+
+def test_compile_groups_linked_dimensions_into_passes():
+    passes = compile_dimensions()
+
+    assert set(passes) == {"product_data", "customer_data", "courier_data", "shipping_data"}
+    assert passes["courier_data"]["tables"] == ["dim_courier", "dim_courier_origin", "dim_courier_destination",
+                                                "dim_country"]
+    build_order = passes["courier_data"]["build_order"]
+    assert build_order.index("dim_country") < build_order.index("dim_courier_origin") < build_order.index("dim_courier")
+
+
+def test_compile_rejects_undeclared_parent():
+    with pytest.raises(ValueError, match="not declared"):
+        compile_dimensions({"dim_a": {"key": ["a"], "id": "a_id", "parents": {"dim_b": ["b"]}}})
+
+
+def test_declared_attribute_reaches_both_backends(monkeypatch, shipments_csv):
+    pytest.importorskip("polars")
+    monkeypatch.setitem(DIMENSIONS["dim_courier"], "attributes", ["carrier_rating", "origin_state"])
+    monkeypatch.setitem(DIMENSION_PASSES, "courier_data", compile_dimensions(DIMENSIONS)["courier_data"])
+    data_df = read_source(shipments_csv)
+
+    expected = build_tables(data_df, backend="pandas")
+    actual = build_tables(data_df, backend="polars")
+
+    assert "origin_state" in expected["dim_courier"].columns
+    assert "origin_state" not in expected["fact_sales_table"].columns
+    assert compare_tables(expected, actual) == {}
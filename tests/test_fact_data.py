@@ -0,0 +1,39 @@
+import logging
+import pytest
+from dataload.dimensions import DIMENSION_PASSES
+from dataload.read_source import read_source
+from dataload.transform_backend import compare_tables, get_backend
+
+
+def _fact_without_first_product(backend_name: str, data_df):
+    backend = get_backend(backend_name)
+    source = backend.prepare(data_df)
+    tables = {}
+    for pass_name in DIMENSION_PASSES:
+        tables.update(backend.dimensions(source, pass_name))
+    missing = tables["dim_product"].iloc[0]
+    tables["dim_product"] = tables["dim_product"].iloc[1:]
+    return missing, backend.fact_data(source, tables)
+
+
+@pytest.mark.parametrize("backend_name", ["pandas", "polars"])
+def test_unmatched_members_are_reported_and_left_out(backend_name, shipments_csv, caplog):
+    if backend_name == "polars":
+        pytest.importorskip("polars")
+    data_df = read_source(shipments_csv)
+
+    with caplog.at_level(logging.WARNING, logger="dataload.tables_data"):
+        missing, fact_df = _fact_without_first_product(backend_name, data_df)
+
+    missing_rows = int((data_df["product_name"] == missing["product_name"]).sum())
+    assert len(fact_df) == len(data_df) - missing_rows
+    assert f"{missing_rows} fact rows left out" in caplog.text
+    assert "dim_product" in caplog.text
+
+
+def test_backends_leave_out_the_same_rows(shipments_csv):
+    pytest.importorskip("polars")
+    data_df = read_source(shipments_csv)
+    expected = {"fact_sales_table": _fact_without_first_product("pandas", data_df)[1]}
+    actual = {"fact_sales_table": _fact_without_first_product("polars", data_df)[1]}
+    assert compare_tables(expected, actual) == {}
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from dataload.key_registry import KeyRegistry, encode_natural_keys
+
+
+def _members() -> pd.DataFrame:
+    return pd.DataFrame({"mode_of_transport": ["Air", "Road", "Road"],
+                         "shipping_priority": [np.nan, np.nan, "High"]})
+
+
+def test_members_differing_outside_a_missing_part_stay_distinct():
+    encoded = encode_natural_keys(_members(), ["mode_of_transport", "shipping_priority"])
+
+    assert encoded.notna().all()
+    assert encoded.is_unique
+
+
+def test_members_with_a_missing_part_keep_their_keys_across_runs():
+    registry = KeyRegistry()
+    first = registry.assign("prior_trans_id", _members(), ["mode_of_transport", "shipping_priority"], "prior_trans_id")
+    assert list(first["prior_trans_id"]) == [1, 2, 3]
+
+    reloaded = KeyRegistry.from_frame(registry.pending())
+    again = reloaded.assign("prior_trans_id", _members().iloc[::-1], ["mode_of_transport", "shipping_priority"],
+                            "prior_trans_id")
+    assert list(again["prior_trans_id"]) == [3, 2, 1]
+    assert reloaded.pending().empty
@@ -0,0 +1,28 @@
+import pandas as pd
+from database.load_audit import block_fingerprint
+from dataload.read_source import read_source
+
+
+def test_fingerprint_ignores_column_order(shipments_csv):
+    block_df = read_source(shipments_csv)
+    reordered = block_df[list(reversed(block_df.columns))]
+    assert block_fingerprint(reordered) == block_fingerprint(block_df)
+
+
+def test_fingerprint_ignores_the_csv_parser(shipments_csv):
+    assert block_fingerprint(read_source(shipments_csv, engine="pyarrow")) == block_fingerprint(read_source(shipments_csv))
+
+
+def test_fingerprint_ignores_dtype_width_and_unit():
+    block_df = pd.DataFrame({"quantity": pd.Series([1, 2], dtype="int16"),
+                             "total_cost": pd.Series([1.5, 2.5], dtype="float32"),
+                             "shipment_date": pd.to_datetime(["2024-01-01", "2024-01-02"]).as_unit("s")})
+    widened = block_df.astype({"quantity": "int64", "total_cost": "float64", "shipment_date": "datetime64[ns]"})
+    assert block_fingerprint(widened) == block_fingerprint(block_df)
+
+
+def test_fingerprint_changes_with_the_data(shipments_csv):
+    block_df = read_source(shipments_csv)
+    changed = block_df.copy()
+    changed.loc[0, "quantity"] += 1
+    assert block_fingerprint(changed) != block_fingerprint(block_df)
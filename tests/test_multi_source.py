@@ -0,0 +1,74 @@
+from concurrent.futures import Future
+import pandas as pd
+from database.populate_db_table import build_tables
+from dataload import multi_source
+from dataload.key_registry import KeyRegistry
+from dataload.multi_source import concat_sources, merge_builder_rows, read_sources
+from dataload.read_source import read_source
+from dataload.transform_backend import compare_tables
+
+
+def _split(path: str, directory, parts: int = 3) -> list[str]:
+    source_df = pd.read_csv(path)
+    paths = []
+    for part in range(parts):
+        part_path = str(directory / f"part{part}.csv")
+        source_df.iloc[part::parts].to_csv(part_path, index=False)
+        paths.append(part_path)
+    return paths
+
+
+def test_workers_distinct_rows_build_the_same_tables(shipments_csv, tmp_path):
+    paths = _split(shipments_csv, tmp_path)
+    sources = [(source_df, builder_rows) for _, source_df, builder_rows, _ in read_sources(paths, max_workers=2)]
+    source_df = concat_sources([source_df for source_df, _ in sources])
+
+    expected = build_tables(source_df, KeyRegistry())
+    actual = build_tables(source_df, KeyRegistry(),
+                          builder_rows=merge_builder_rows([builder_rows for _, builder_rows in sources]))
+
+    assert compare_tables(expected, actual) == {}
+    assert len(expected["fact_sales_table"]) == sum(len(read_source(path)) for path in paths)
+
+
+def test_unreadable_file_is_reported_and_the_others_read(shipments_csv, tmp_path):
+    missing = str(tmp_path / "missing.csv")
+    failures: dict[str, str] = {}
+    read = [path for path, _, _, _ in read_sources([shipments_csv, missing], max_workers=2, failures=failures)]
+
+    assert read == [shipments_csv]
+    assert list(failures) == [missing]
+
+
+class _RecordingExecutor:
+    """Runs the submitted files at once in this process, recording how many were submitted."""
+
+    submitted: list[str] = []
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, func, path, *args):
+        self.submitted.append(path)
+        future = Future()
+        future.set_result(func(path, *args))
+        return future
+
+
+def test_at_most_max_workers_files_are_read_ahead(shipments_csv, tmp_path, monkeypatch):
+    paths = _split(shipments_csv, tmp_path, parts=5)
+    monkeypatch.setattr(multi_source, "ProcessPoolExecutor", _RecordingExecutor)
+    _RecordingExecutor.submitted = []
+
+    sources = read_sources(paths, max_workers=2)
+    assert next(sources)[0] == paths[0]
+    assert _RecordingExecutor.submitted == paths[:3]
+
+    assert [path for path, _, _, _ in sources] == paths[1:]
+    assert _RecordingExecutor.submitted == paths
@@ -0,0 +1,69 @@
+import os
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from database.aggregates import rebuild_aggregates
+from database.create_table import create_db_table
+from database.db_query import query_table
+from database.partitions import FACT_TABLE, REPORT_TABLE, delete_report_month, detach_month, month_bounds
+from database.populate_db_table import populate_tables
+from database.report_queries import REPORT_QUERIES
+from dataload.read_source import read_source
+
+
+def _reports_match(engine) -> None:
+    with engine.connect() as connection:
+        for statement in REPORT_QUERIES.values():
+            expected = query_table(statement, connection, use_aggregates=False)
+            routed = query_table(statement, connection, use_aggregates=True)
+            expected, routed = (df.sort_values(list(df.columns[:-1])).reset_index(drop=True) for df in (expected, routed))
+            pd.testing.assert_frame_equal(routed, expected, check_dtype=False, check_names=False)
+
+
+def _first_month(engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT min(shipment_date_id) / 100 FROM {FACT_TABLE}")).scalar()
+
+
+def test_rebuilt_aggregates_drop_removed_facts(shipments_csv, sqlite_engine):
+    create_db_table(sqlite_engine)
+    populate_tables(sqlite_engine, read_source(shipments_csv))
+    start, end = month_bounds(_first_month(sqlite_engine))
+
+    with sqlite_engine.begin() as connection:
+        connection.execute(text(f"DELETE FROM {FACT_TABLE} WHERE shipment_date_id >= :start AND shipment_date_id < :end"),
+                           {"start": start, "end": end})
+        rebuild_aggregates(connection)
+
+    _reports_match(sqlite_engine)
+
+
+def _report_months(engine) -> set[int]:
+    with engine.connect() as connection:
+        return set(connection.execute(text(f"SELECT DISTINCT shipment_date_id / 100 FROM {REPORT_TABLE}")).scalars())
+
+
+def test_delete_report_month_removes_only_that_month(shipments_csv, sqlite_engine):
+    create_db_table(sqlite_engine)
+    populate_tables(sqlite_engine, read_source(shipments_csv), flatten="wide")
+    month = _first_month(sqlite_engine)
+    months = _report_months(sqlite_engine)
+
+    with sqlite_engine.begin() as connection:
+        assert delete_report_month(connection, month) > 0
+
+    assert _report_months(sqlite_engine) == months - {month}
+
+
+@pytest.mark.skipif("TEST_POSTGRES_URL" not in os.environ, reason="needs a PostgreSQL database (TEST_POSTGRES_URL)")
+def test_detach_month_updates_routed_reports(shipments_csv):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    try:
+        create_db_table(engine, partition_by_month=True)
+        populate_tables(engine, read_source(shipments_csv), flatten="wide")
+        month = _first_month(engine)
+        detach_month(engine, month)
+        _reports_match(engine)
+        assert month not in _report_months(engine)
+    finally:
+        engine.dispose()